@@ -0,0 +1,154 @@
+"""
+Benchmarks of the decode, serialize and code generation hot paths
+
+    python benchmarks/run.py                             # print results
+    python benchmarks/run.py --save baseline.json        # store a baseline
+    python benchmarks/run.py --compare baseline.json     # fail on regressions
+    python benchmarks/run.py --spec "Data Output from F1 24 v27.2x.docx"
+
+Results are the best time per operation of several repeats. Baselines are
+machine specific, record them on the machine that compares against them.
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from udp import packets
+from udp.dispatch import Dispatcher
+
+GAME_VERSIONS = ("F123", "F124")
+DEFAULT_THRESHOLD = 0.25
+REPEAT = 3
+
+
+def measure(func) -> float:
+    """Returns the best time in seconds of one call of ``func``"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(REPEAT, number)) / number
+
+
+def datagram(header_field: tuple, packet_type) -> bytes:
+    packet_format, packet_version, packet_id = header_field
+    data = bytearray(packet_type().pack())
+    data[0:2] = packet_format.to_bytes(2, "little")
+    data[5] = packet_version
+    data[6] = packet_id
+    return bytes(data)
+
+
+def packet_benchmarks(game_version: str, results: dict, selected: str = ""):
+    module = packets.load(os.path.join(ROOT, "data", game_version, "packets.py"))
+    packet_types = module.HEADER_FIELD_TO_PACKET_TYPE
+    dispatcher = Dispatcher(packet_types)
+
+    def add(name: str, func):
+        if selected in name:
+            results[name] = measure(func)
+
+    for header_field, packet_type in packet_types.items():
+        data = datagram(header_field, packet_type)
+        packet = packet_type.unpack(data)
+        name = f"{game_version}.{packet_type.__name__}"
+        add(f"unpack.{name}", lambda: packet_type.unpack(data))
+        add(f"to_dict.{name}", packet.to_dict)
+        add(f"to_json.{name}", packet.to_json)
+
+    header_field, packet_type = next(iter(packet_types.items()))
+    data = datagram(header_field, packet_type)
+
+    # F1 23 uses camelCase field names, the header layout is the same
+    header_names = [name for name, _ in module.PacketHeader._fields_]
+    format_name, version_name, id_name = header_names[0], header_names[4], header_names[5]
+
+    def dispatch_header():
+        header = module.PacketHeader.from_buffer_copy(data)
+        return packet_types[(getattr(header, format_name), getattr(header, version_name), getattr(header, id_name))]
+
+    add(f"dispatch.{game_version}.HEADER_FIELD_TO_PACKET_TYPE", dispatch_header)
+    add(f"dispatch.{game_version}.Dispatcher", lambda: dispatcher.get(data))
+
+
+def codegen_benchmarks(spec_path: str, results: dict, selected: str = ""):
+    from utils.doc import spec
+    from utils.doc.schema import Schema
+    from write import appendices
+    from write.emitters import CtypesEmitter, DtypeEmitter
+    from write.packet_classes import packet_classes
+
+    # measure a cold run, the parsed document is cached per process and on disk
+    os.environ[spec.CACHE_DIR_ENV] = ""
+
+    def generate_packet_classes():
+        spec._load.cache_clear()
+        text = spec.load(spec_path).text
+        schema = Schema.from_text(text)
+        CtypesEmitter().emit(schema)
+        DtypeEmitter().emit(schema)
+        packet_classes.get_HEADER_FIELD_TO_PACKET_TYPE_str(spec_path)
+
+    def generate_appendices():
+        spec._load.cache_clear()
+        dicts = appendices.get(os.path.join(ROOT, "src", "utils", "doc", "appendices"), spec_path)
+        for value in dicts.values():
+            appendices.format_dict(value)
+
+    for name, func in (("codegen.packet_classes", generate_packet_classes),
+                       ("codegen.appendices", generate_appendices)):
+        if selected in name:
+            results[name] = min(timeit.repeat(func, number=1, repeat=3))
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Returns ``(name, baseline, result)`` of every benchmark slower than ``threshold`` allows"""
+    regressions = []
+    for name, result in results.items():
+        if name in baseline and result > baseline[name] * (1 + threshold):
+            regressions.append((name, baseline[name], result))
+    return regressions
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmarks decode, serialize and code generation")
+    parser.add_argument("--spec", help="EA spec .docx, enables the code generation benchmarks")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--save", metavar="PATH", help="store the results as baseline")
+    parser.add_argument("--compare", metavar="PATH", help="baseline to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed relative slowdown against the baseline")
+    return parser
+
+
+if __name__ == '__main__':
+    args = get_parser().parse_args()
+
+    results = {}
+    for game_version in GAME_VERSIONS:
+        packet_benchmarks(game_version, results, args.filter)
+    if args.spec:
+        codegen_benchmarks(args.spec, results, args.filter)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    for name, value in results.items():
+        line = f"{name:<70} {value * 1e6:>12.2f} us"
+        if name in baseline:
+            line += f" {value / baseline[name] - 1:>+8.1%}"
+        print(line)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, old, new in regressions:
+        print(f"regression: {name} {old * 1e6:.2f} us -> {new * 1e6:.2f} us")
+    sys.exit(1 if regressions else 0)
@@ -80,19 +80,25 @@ class PacketMixin(object):
         return ctypes.sizeof(cls)
 
     @classmethod
-    def unpack(cls, buffer):
+    def unpack(cls, buffer, copy=True):
         """Attempts to unpack the binary structure into a python structure
 
         Args:
             buffer (bytes):
                 - The encoded buffer to decode
+            copy (bool):
+                - If ``False`` no copy is made and the packet is a view over
+                  ``buffer``, which has to be writable (``bytearray``,
+                  ``memoryview``) and must not change while the packet is used
 
         """
-        return cls.from_buffer_copy(buffer)
+        if copy:
+            return cls.from_buffer_copy(buffer)
+        return cls.from_buffer(buffer)
 
     def to_dict(self):
         """Returns a ``dict`` with key-values derived from _fields_"""
-        return {k: self.get_value(k) for k, _ in self._fields_}
+        return _get_serializer(type(self))(self)
 
     def to_json(self):
         """Returns a ``str`` of sorted JSON derived from _fields_"""
@@ -129,6 +135,48 @@ def _format_array_type(value):
     return results
 
 
+def _compile_serializer(cls):
+    """Compiles a ``to_dict`` for ``cls`` that knows the type of every field
+
+    The output is the same as formatting each field with ``_format_type``,
+    but the type checks are done once per class instead of once per value.
+    """
+    namespace = {}
+    items = []
+
+    for i, (name, field_type) in enumerate(cls._fields_):
+        value = f"self.{name}"
+        if issubclass(field_type, ctypes.Array):
+            item_type = field_type._type_
+            if item_type is ctypes.c_char:
+                value = f"{value}.decode()"
+            elif isinstance(item_type, type) and issubclass(item_type, Packet):
+                namespace[f"_to_dict_{i}"] = _get_serializer(item_type)
+                value = f"[_to_dict_{i}(item) for item in {value}]"
+            else:
+                value = f"{value}[:]"
+        elif issubclass(field_type, PacketMixin):
+            namespace[f"_to_dict_{i}"] = _get_serializer(field_type)
+            value = f"_to_dict_{i}({value})"
+        elif field_type in (ctypes.c_float, ctypes.c_double):
+            value = f"round({value}, 3)"
+        elif field_type is ctypes.c_char:
+            value = f"{value}.decode()"
+        items.append(f"        {name!r}: {value},\n")
+
+    source = "def to_dict(self):\n    return {\n" + "".join(items) + "    }\n"
+    exec(source, namespace)
+    cls._serializer = namespace["to_dict"]
+    return cls._serializer
+
+
+def _get_serializer(cls):
+    serializer = cls.__dict__.get("_serializer")
+    if serializer is None:
+        serializer = _compile_serializer(cls)
+    return serializer
+
+
 class Packet(ctypes.LittleEndianStructure, PacketMixin):
     """The base packet class for API version F1 22"""
 
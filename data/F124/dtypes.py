@@ -0,0 +1,537 @@
+"""
+File created by: https://github.com/JulMai/f1_udp_socket_spec
+
+Packed little-endian NumPy structured dtypes with the same layout as the
+ctypes classes in packets.py, e.g.
+
+	np.frombuffer(b"".join(datagrams), dtype=PacketCarTelemetryData)
+
+decodes a batch of equally sized datagrams into one structured array.
+"""
+
+import numpy as np
+
+"""
+The following code was produced by:
+https://github.com/JulMai/f1_udp_socket_spec/tree/main/src/write/packet_classes/packet_classes.py
+"""
+
+
+PacketHeader = np.dtype([
+	("packet_format", "<u2"),
+	("game_year", "u1"),
+	("game_major_version", "u1"),
+	("game_minor_version", "u1"),
+	("packet_version", "u1"),
+	("packet_id", "u1"),
+	("session_uid", "<u8"),
+	("session_time", "<f4"),
+	("frame_identifier", "<u4"),
+	("overall_frame_identifier", "<u4"),
+	("player_car_index", "u1"),
+	("secondary_player_car_index", "u1"),
+])
+
+
+CarMotionData = np.dtype([
+	("world_position_x", "<f4"),
+	("world_position_y", "<f4"),
+	("world_position_z", "<f4"),
+	("world_velocity_x", "<f4"),
+	("world_velocity_y", "<f4"),
+	("world_velocity_z", "<f4"),
+	("world_forward_dir_x", "<i2"),
+	("world_forward_dir_y", "<i2"),
+	("world_forward_dir_z", "<i2"),
+	("world_right_dir_x", "<i2"),
+	("world_right_dir_y", "<i2"),
+	("world_right_dir_z", "<i2"),
+	("g_force_lateral", "<f4"),
+	("g_force_longitudinal", "<f4"),
+	("g_force_vertical", "<f4"),
+	("yaw", "<f4"),
+	("pitch", "<f4"),
+	("roll", "<f4"),
+])
+
+
+PacketMotionData = np.dtype([
+	("header", PacketHeader),
+	("car_motion_data", CarMotionData, (22,)),
+])
+
+
+MarshalZone = np.dtype([
+	("zone_start", "<f4"),
+	("zone_flag", "i1"),
+])
+
+
+WeatherForecastSample = np.dtype([
+	("session_type", "u1"),
+	("time_offset", "u1"),
+	("weather", "u1"),
+	("track_temperature", "i1"),
+	("track_temperature_change", "i1"),
+	("air_temperature", "i1"),
+	("air_temperature_change", "i1"),
+	("rain_percentage", "u1"),
+])
+
+
+PacketSessionData = np.dtype([
+	("header", PacketHeader),
+	("weather", "u1"),
+	("track_temperature", "i1"),
+	("air_temperature", "i1"),
+	("total_laps", "u1"),
+	("track_length", "<u2"),
+	("session_type", "u1"),
+	("track_id", "i1"),
+	("formula", "u1"),
+	("session_time_left", "<u2"),
+	("session_duration", "<u2"),
+	("pit_speed_limit", "u1"),
+	("game_paused", "u1"),
+	("is_spectating", "u1"),
+	("spectator_car_index", "u1"),
+	("sli_pro_native_support", "u1"),
+	("num_marshal_zones", "u1"),
+	("marshal_zones", MarshalZone, (21,)),
+	("safety_car_status", "u1"),
+	("network_game", "u1"),
+	("num_weather_forecast_samples", "u1"),
+	("weather_forecast_samples", WeatherForecastSample, (64,)),
+	("forecast_accuracy", "u1"),
+	("ai_difficulty", "u1"),
+	("season_link_identifier", "<u4"),
+	("weekend_link_identifier", "<u4"),
+	("session_link_identifier", "<u4"),
+	("pit_stop_window_ideal_lap", "u1"),
+	("pit_stop_window_latest_lap", "u1"),
+	("pit_stop_rejoin_position", "u1"),
+	("steering_assist", "u1"),
+	("braking_assist", "u1"),
+	("gearbox_assist", "u1"),
+	("pit_assist", "u1"),
+	("pit_release_assist", "u1"),
+	("ersassist", "u1"),
+	("drsassist", "u1"),
+	("dynamic_racing_line", "u1"),
+	("dynamic_racing_line_type", "u1"),
+	("game_mode", "u1"),
+	("rule_set", "u1"),
+	("time_of_day", "<u4"),
+	("session_length", "u1"),
+	("speed_units_lead_player", "u1"),
+	("temperature_units_lead_player", "u1"),
+	("speed_units_secondary_player", "u1"),
+	("temperature_units_secondary_player", "u1"),
+	("num_safety_car_periods", "u1"),
+	("num_virtual_safety_car_periods", "u1"),
+	("num_red_flag_periods", "u1"),
+	("equal_car_performance", "u1"),
+	("recovery_mode", "u1"),
+	("flashback_limit", "u1"),
+	("surface_type", "u1"),
+	("low_fuel_mode", "u1"),
+	("race_starts", "u1"),
+	("tyre_temperature", "u1"),
+	("pit_lane_tyre_sim", "u1"),
+	("car_damage", "u1"),
+	("car_damage_rate", "u1"),
+	("collisions", "u1"),
+	("collisions_off_for_first_lap_only", "u1"),
+	("mp_unsafe_pit_release", "u1"),
+	("mp_off_for_griefing", "u1"),
+	("corner_cutting_stringency", "u1"),
+	("parc_ferme_rules", "u1"),
+	("pit_stop_experience", "u1"),
+	("safety_car", "u1"),
+	("safety_car_experience", "u1"),
+	("formation_lap", "u1"),
+	("formation_lap_experience", "u1"),
+	("red_flags", "u1"),
+	("affects_licence_level_solo", "u1"),
+	("affects_licence_level_mp", "u1"),
+	("num_sessions_in_weekend", "u1"),
+	("weekend_structure", "u1", (12,)),
+	("sector2lap_distance_start", "<f4"),
+	("sector3lap_distance_start", "<f4"),
+])
+
+
+LapData = np.dtype([
+	("last_lap_time_in_ms", "<u4"),
+	("current_lap_time_in_ms", "<u4"),
+	("sector1time_mspart", "<u2"),
+	("sector1time_minutes_part", "u1"),
+	("sector2time_mspart", "<u2"),
+	("sector2time_minutes_part", "u1"),
+	("delta_to_car_in_front_mspart", "<u2"),
+	("delta_to_car_in_front_minutes_part", "u1"),
+	("delta_to_race_leader_mspart", "<u2"),
+	("delta_to_race_leader_minutes_part", "u1"),
+	("lap_distance", "<f4"),
+	("total_distance", "<f4"),
+	("safety_car_delta", "<f4"),
+	("car_position", "u1"),
+	("current_lap_num", "u1"),
+	("pit_status", "u1"),
+	("num_pit_stops", "u1"),
+	("sector", "u1"),
+	("current_lap_invalid", "u1"),
+	("penalties", "u1"),
+	("total_warnings", "u1"),
+	("corner_cutting_warnings", "u1"),
+	("num_unserved_drive_through_pens", "u1"),
+	("num_unserved_stop_go_pens", "u1"),
+	("grid_position", "u1"),
+	("driver_status", "u1"),
+	("result_status", "u1"),
+	("pit_lane_timer_active", "u1"),
+	("pit_lane_time_in_lane_in_ms", "<u2"),
+	("pit_stop_timer_in_ms", "<u2"),
+	("pit_stop_should_serve_pen", "u1"),
+	("speed_trap_fastest_speed", "<f4"),
+	("speed_trap_fastest_lap", "u1"),
+])
+
+
+PacketLapData = np.dtype([
+	("header", PacketHeader),
+	("lap_data", LapData, (22,)),
+	("time_trial_pbcar_idx", "u1"),
+	("time_trial_rival_car_idx", "u1"),
+])
+
+
+PacketEventData = np.dtype([
+	("header", PacketHeader),
+	("event_string_code", "u1", (4,)),
+])
+
+
+ParticipantData = np.dtype([
+	("ai_controlled", "u1"),
+	("driver_id", "u1"),
+	("network_id", "u1"),
+	("team_id", "u1"),
+	("my_team", "u1"),
+	("race_number", "u1"),
+	("nationality", "u1"),
+	("name", "S48"),
+	("your_telemetry", "u1"),
+	("show_online_names", "u1"),
+	("tech_level", "<u2"),
+	("platform", "u1"),
+])
+
+
+PacketParticipantsData = np.dtype([
+	("header", PacketHeader),
+	("num_active_cars", "u1"),
+	("participants", ParticipantData, (22,)),
+])
+
+
+CarSetupData = np.dtype([
+	("front_wing", "u1"),
+	("rear_wing", "u1"),
+	("on_throttle", "u1"),
+	("off_throttle", "u1"),
+	("front_camber", "<f4"),
+	("rear_camber", "<f4"),
+	("front_toe", "<f4"),
+	("rear_toe", "<f4"),
+	("front_suspension", "u1"),
+	("rear_suspension", "u1"),
+	("front_anti_roll_bar", "u1"),
+	("rear_anti_roll_bar", "u1"),
+	("front_suspension_height", "u1"),
+	("rear_suspension_height", "u1"),
+	("brake_pressure", "u1"),
+	("brake_bias", "u1"),
+	("engine_braking", "u1"),
+	("rear_left_tyre_pressure", "<f4"),
+	("rear_right_tyre_pressure", "<f4"),
+	("front_left_tyre_pressure", "<f4"),
+	("front_right_tyre_pressure", "<f4"),
+	("ballast", "u1"),
+	("fuel_load", "<f4"),
+])
+
+
+PacketCarSetupData = np.dtype([
+	("header", PacketHeader),
+	("car_setups", CarSetupData, (22,)),
+	("next_front_wing_value", "<f4"),
+])
+
+
+CarTelemetryData = np.dtype([
+	("speed", "<u2"),
+	("throttle", "<f4"),
+	("steer", "<f4"),
+	("brake", "<f4"),
+	("clutch", "u1"),
+	("gear", "i1"),
+	("engine_rpm", "<u2"),
+	("drs", "u1"),
+	("rev_lights_percent", "u1"),
+	("rev_lights_bit_value", "<u2"),
+	("brakes_temperature", "<u2", (4,)),
+	("tyres_surface_temperature", "u1", (4,)),
+	("tyres_inner_temperature", "u1", (4,)),
+	("engine_temperature", "<u2"),
+	("tyres_pressure", "<f4", (4,)),
+	("surface_type", "u1", (4,)),
+])
+
+
+PacketCarTelemetryData = np.dtype([
+	("header", PacketHeader),
+	("car_telemetry_data", CarTelemetryData, (22,)),
+	("mfd_panel_index", "u1"),
+	("mfd_panel_index_secondary_player", "u1"),
+	("suggested_gear", "i1"),
+])
+
+
+CarStatusData = np.dtype([
+	("traction_control", "u1"),
+	("anti_lock_brakes", "u1"),
+	("fuel_mix", "u1"),
+	("front_brake_bias", "u1"),
+	("pit_limiter_status", "u1"),
+	("fuel_in_tank", "<f4"),
+	("fuel_capacity", "<f4"),
+	("fuel_remaining_laps", "<f4"),
+	("max_rpm", "<u2"),
+	("idle_rpm", "<u2"),
+	("max_gears", "u1"),
+	("drs_allowed", "u1"),
+	("drs_activation_distance", "<u2"),
+	("actual_tyre_compound", "u1"),
+	("visual_tyre_compound", "u1"),
+	("tyres_age_laps", "u1"),
+	("vehicle_fia_flags", "i1"),
+	("engine_power_ice", "<f4"),
+	("engine_power_mguk", "<f4"),
+	("ers_store_energy", "<f4"),
+	("ers_deploy_mode", "u1"),
+	("ers_harvested_this_lap_mguk", "<f4"),
+	("ers_harvested_this_lap_mguh", "<f4"),
+	("ers_deployed_this_lap", "<f4"),
+	("network_paused", "u1"),
+])
+
+
+PacketCarStatusData = np.dtype([
+	("header", PacketHeader),
+	("car_status_data", CarStatusData, (22,)),
+])
+
+
+FinalClassificationData = np.dtype([
+	("position", "u1"),
+	("num_laps", "u1"),
+	("grid_position", "u1"),
+	("points", "u1"),
+	("num_pit_stops", "u1"),
+	("result_status", "u1"),
+	("best_lap_time_in_ms", "<u4"),
+	("total_race_time", "<f8"),
+	("penalties_time", "u1"),
+	("num_penalties", "u1"),
+	("num_tyre_stints", "u1"),
+	("tyre_stints_actual", "u1", (8,)),
+	("tyre_stints_visual", "u1", (8,)),
+	("tyre_stints_end_laps", "u1", (8,)),
+])
+
+
+PacketFinalClassificationData = np.dtype([
+	("header", PacketHeader),
+	("num_cars", "u1"),
+	("classification_data", FinalClassificationData, (22,)),
+])
+
+
+LobbyInfoData = np.dtype([
+	("ai_controlled", "u1"),
+	("team_id", "u1"),
+	("nationality", "u1"),
+	("platform", "u1"),
+	("name", "S48"),
+	("car_number", "u1"),
+	("your_telemetry", "u1"),
+	("show_online_names", "u1"),
+	("tech_level", "<u2"),
+	("ready_status", "u1"),
+])
+
+
+PacketLobbyInfoData = np.dtype([
+	("header", PacketHeader),
+	("num_players", "u1"),
+	("lobby_players", LobbyInfoData, (22,)),
+])
+
+
+CarDamageData = np.dtype([
+	("tyres_wear", "<f4", (4,)),
+	("tyres_damage", "u1", (4,)),
+	("brakes_damage", "u1", (4,)),
+	("front_left_wing_damage", "u1"),
+	("front_right_wing_damage", "u1"),
+	("rear_wing_damage", "u1"),
+	("floor_damage", "u1"),
+	("diffuser_damage", "u1"),
+	("sidepod_damage", "u1"),
+	("drs_fault", "u1"),
+	("ers_fault", "u1"),
+	("gear_box_damage", "u1"),
+	("engine_damage", "u1"),
+	("engine_mguhwear", "u1"),
+	("engine_eswear", "u1"),
+	("engine_cewear", "u1"),
+	("engine_icewear", "u1"),
+	("engine_mgukwear", "u1"),
+	("engine_tcwear", "u1"),
+	("engine_blown", "u1"),
+	("engine_seized", "u1"),
+])
+
+
+PacketCarDamageData = np.dtype([
+	("header", PacketHeader),
+	("car_damage_data", CarDamageData, (22,)),
+])
+
+
+LapHistoryData = np.dtype([
+	("lap_time_in_ms", "<u4"),
+	("sector1time_mspart", "<u2"),
+	("sector1time_minutes_part", "u1"),
+	("sector2time_mspart", "<u2"),
+	("sector2time_minutes_part", "u1"),
+	("sector3time_mspart", "<u2"),
+	("sector3time_minutes_part", "u1"),
+	("lap_valid_bit_flags", "u1"),
+])
+
+
+TyreStintHistoryData = np.dtype([
+	("end_lap", "u1"),
+	("tyre_actual_compound", "u1"),
+	("tyre_visual_compound", "u1"),
+])
+
+
+PacketSessionHistoryData = np.dtype([
+	("header", PacketHeader),
+	("car_idx", "u1"),
+	("num_laps", "u1"),
+	("num_tyre_stints", "u1"),
+	("best_lap_time_lap_num", "u1"),
+	("best_sector1lap_num", "u1"),
+	("best_sector2lap_num", "u1"),
+	("best_sector3lap_num", "u1"),
+	("lap_history_data", LapHistoryData, (100,)),
+	("tyre_stints_history_data", TyreStintHistoryData, (8,)),
+])
+
+
+TyreSetData = np.dtype([
+	("actual_tyre_compound", "u1"),
+	("visual_tyre_compound", "u1"),
+	("wear", "u1"),
+	("available", "u1"),
+	("recommended_session", "u1"),
+	("life_span", "u1"),
+	("usable_life", "u1"),
+	("lap_delta_time", "<i2"),
+	("fitted", "u1"),
+])
+
+
+PacketTyreSetsData = np.dtype([
+	("header", PacketHeader),
+	("car_idx", "u1"),
+	("tyre_set_data", TyreSetData, (20,)),
+	("fitted_idx", "u1"),
+])
+
+
+PacketMotionExData = np.dtype([
+	("header", PacketHeader),
+	("suspension_position", "<f4", (4,)),
+	("suspension_velocity", "<f4", (4,)),
+	("suspension_acceleration", "<f4", (4,)),
+	("wheel_speed", "<f4", (4,)),
+	("wheel_slip_ratio", "<f4", (4,)),
+	("wheel_slip_angle", "<f4", (4,)),
+	("wheel_lat_force", "<f4", (4,)),
+	("wheel_long_force", "<f4", (4,)),
+	("height_of_cogabove_ground", "<f4"),
+	("local_velocity_x", "<f4"),
+	("local_velocity_y", "<f4"),
+	("local_velocity_z", "<f4"),
+	("angular_velocity_x", "<f4"),
+	("angular_velocity_y", "<f4"),
+	("angular_velocity_z", "<f4"),
+	("angular_acceleration_x", "<f4"),
+	("angular_acceleration_y", "<f4"),
+	("angular_acceleration_z", "<f4"),
+	("front_wheels_angle", "<f4"),
+	("wheel_vert_force", "<f4", (4,)),
+	("front_aero_height", "<f4"),
+	("rear_aero_height", "<f4"),
+	("front_roll_angle", "<f4"),
+	("rear_roll_angle", "<f4"),
+	("chassis_yaw", "<f4"),
+])
+
+
+TimeTrialDataSet = np.dtype([
+	("car_idx", "u1"),
+	("team_id", "u1"),
+	("lap_time_in_ms", "<u4"),
+	("sector1time_in_ms", "<u4"),
+	("sector2time_in_ms", "<u4"),
+	("sector3time_in_ms", "<u4"),
+	("traction_control", "u1"),
+	("gearbox_assist", "u1"),
+	("anti_lock_brakes", "u1"),
+	("equal_car_performance", "u1"),
+	("custom_setup", "u1"),
+	("valid", "u1"),
+])
+
+
+PacketTimeTrialData = np.dtype([
+	("header", PacketHeader),
+	("player_session_best_data_set", TimeTrialDataSet),
+	("personal_best_data_set", TimeTrialDataSet),
+	("rival_data_set", TimeTrialDataSet),
+])
+
+
+HEADER_FIELD_TO_DTYPE = {
+	(2024, 1, 0) : PacketMotionData,
+	(2024, 1, 1) : PacketSessionData,
+	(2024, 1, 2) : PacketLapData,
+	(2024, 1, 3) : PacketEventData,
+	(2024, 1, 4) : PacketParticipantsData,
+	(2024, 1, 5) : PacketCarSetupData,
+	(2024, 1, 6) : PacketCarTelemetryData,
+	(2024, 1, 7) : PacketCarStatusData,
+	(2024, 1, 8) : PacketFinalClassificationData,
+	(2024, 1, 9) : PacketLobbyInfoData,
+	(2024, 1, 10) : PacketCarDamageData,
+	(2024, 1, 11) : PacketSessionHistoryData,
+	(2024, 1, 12) : PacketTyreSetsData,
+	(2024, 1, 13) : PacketMotionExData,
+	(2024, 1, 14) : PacketTimeTrialData,
+}
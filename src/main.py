@@ -0,0 +1,201 @@
+import argparse
+import logging
+
+from udp import multiproc, packets, replay, synthetic
+from udp.delta import DeltaEncoder
+from udp.metrics import Metrics
+from udp.sampling import Sampler, parse_rule
+from udp.shm import DEFAULT_SLOTS, RingWriter
+from udp.recording import Recorder, RecordingReader
+from udp.receiver import Receiver, create_socket, DEFAULT_HOST, DEFAULT_PORT, DEFAULT_RCVBUF
+
+
+def packet_id(value: str):
+    return int(value) if value.isdigit() else value
+
+
+def ports(value: str) -> list:
+    first, _, last = value.partition("-")
+    return list(range(int(first), int(last or first) + 1))
+
+
+def sample_rule(value: str) -> tuple:
+    packet, _, rule = value.partition("=")
+    return packet_id(packet), parse_rule(rule)
+
+
+def address(value: str) -> tuple:
+    host, _, port = value.rpartition(":")
+    return host.strip("[]") or "127.0.0.1", int(port)
+
+
+def print_packet(packet, address):
+    print(packet.to_json())
+
+
+def print_handler(worker: int):
+    return print_packet
+
+
+def receive(args):
+    if len(args.port) > 1 or args.workers > 1:
+        receive_multiproc(args)
+        return
+    packets_module = packets.load(args.packets)
+    sock = create_socket(args.host, args.port[0], args.rcvbuf)
+    metrics = None
+    if args.metrics_port:
+        metrics = Metrics()
+        metrics.serve(args.metrics_port)
+    sampler = Sampler(dict(args.sample), packets_module) if args.sample else None
+    receiver = Receiver(packets_module, sock, stats_interval=args.stats_interval, packet_ids=args.packet_ids,
+                        batch_size=args.batch_size, metrics=metrics, sampler=sampler)
+    if args.verbose:
+        receiver.add_handler(print_packet)
+    recorder = None
+    if args.record:
+        recorder = Recorder(args.record)
+        receiver.add_raw_handler(lambda datagram, address: recorder.write(datagram))
+    if args.forward:
+        encoder = DeltaEncoder(packets_module)
+        forward_sock = replay.create_socket(args.forward)
+
+        def forward(datagram, address):
+            message = encoder.encode(datagram)
+            if message is None:
+                return
+            try:
+                forward_sock.send(message)
+            except ConnectionRefusedError:
+                pass
+
+        receiver.add_raw_handler(forward)
+    ring = None
+    if args.shm:
+        ring = RingWriter(args.shm, args.shm_slots)
+        receiver.add_raw_handler(lambda datagram, address: ring.write(datagram))
+    try:
+        receiver.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        receiver.close()
+        if recorder is not None:
+            recorder.close()
+        if ring is not None:
+            ring.close()
+
+
+def receive_multiproc(args):
+    ingest = multiproc.Ingest(args.packets, args.port, args.workers, args.host, args.rcvbuf, args.stats_interval,
+                              packet_ids=args.packet_ids, handler_factory=print_handler if args.verbose else None,
+                              batch_size=args.batch_size, sample=dict(args.sample or ()))
+    try:
+        ingest.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ingest.close()
+
+
+def replay_recording(args):
+    sock = replay.create_socket(args.target)
+    with RecordingReader(args.recording) as reader:
+        try:
+            result = replay.replay(reader.records(), sock, args.speed, args.batch_size, args.stats_interval)
+        except KeyboardInterrupt:
+            return
+        finally:
+            sock.close()
+    logging.info("replayed %d packets at %.1f packets/s", result["packets"], result["packets_per_second"])
+
+
+def generate(args):
+    packets_module = packets.load(args.packets)
+    sessions = [synthetic.SyntheticSession(packets_module, args.cars) for _ in range(args.sessions)]
+    sock = replay.create_socket(args.target)
+    try:
+        result = synthetic.run(sessions, sock, args.rate, args.duration, args.stats_interval)
+    except KeyboardInterrupt:
+        return
+    finally:
+        sock.close()
+    logging.info("generated %d packets at %.1f packets/s", result["packets"], result["packets_per_second"])
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Receives, records and replays F1 UDP telemetry")
+    subparsers = parser.add_subparsers(required=True)
+
+    receive_parser = subparsers.add_parser("receive", help="receive and decode telemetry")
+    receive_parser.set_defaults(func=receive)
+    receive_parser.add_argument("--packets", default=packets.DEFAULT_PATH,
+                                help="generated packets.py of the game version")
+    receive_parser.add_argument("--host", default=DEFAULT_HOST)
+    receive_parser.add_argument("--port", type=ports, default=[DEFAULT_PORT],
+                                help="port or range of ports like 20777-20796, one worker process per port")
+    receive_parser.add_argument("--workers", type=int, default=1,
+                                help="worker processes sharing the port with SO_REUSEPORT")
+    receive_parser.add_argument("--rcvbuf", type=int, default=DEFAULT_RCVBUF,
+                                help="requested SO_RCVBUF in bytes")
+    receive_parser.add_argument("--stats-interval", type=float, default=1.0)
+    receive_parser.add_argument("--packet-id", dest="packet_ids", action="append", type=packet_id,
+                                help="packet id or class name to decode, repeatable (default: all)")
+    receive_parser.add_argument("--sample", action="append", type=sample_rule, metavar="PACKET=RULE",
+                                help="decode only some datagrams of a packet id or class name, RULE is every:N, "
+                                     "hz:RATE, interval:SECONDS, on-change or drop; repeatable")
+    receive_parser.add_argument("--batch-size", type=int, default=1,
+                                help="datagrams per receive syscall (recvmmsg on Linux)")
+    receive_parser.add_argument("--record", metavar="PATH",
+                                help="append every datagram to the recording at PATH")
+    receive_parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                                help="serve loss, reordering, jitter and decode time per source at "
+                                     "http://127.0.0.1:PORT/metrics")
+    receive_parser.add_argument("--forward", type=address, metavar="HOST:PORT",
+                                help="forward every datagram delta encoded, see udp.delta.DeltaDecoder")
+    receive_parser.add_argument("--shm", metavar="NAME",
+                                help="write every datagram to the shared memory ring buffer NAME for local readers")
+    receive_parser.add_argument("--shm-slots", type=int, default=DEFAULT_SLOTS,
+                                help="datagrams the ring buffer holds")
+    receive_parser.add_argument("-v", "--verbose", action="store_true",
+                                help="print every packet as JSON")
+
+    replay_parser = subparsers.add_parser("replay", help="send a recording to a UDP target")
+    replay_parser.set_defaults(func=replay_recording)
+    replay_parser.add_argument("recording")
+    replay_parser.add_argument("--target", type=address, default=("127.0.0.1", DEFAULT_PORT),
+                               help="host:port to send to")
+    replay_parser.add_argument("--speed", type=float, default=1.0,
+                               help="N times the recorded cadence, 0 for as fast as possible")
+    replay_parser.add_argument("--batch-size", type=int, default=replay.DEFAULT_BATCH_SIZE,
+                               help="datagrams per send syscall")
+    replay_parser.add_argument("--stats-interval", type=float, default=1.0)
+
+    generate_parser = subparsers.add_parser("generate", help="send synthetic telemetry to a UDP target")
+    generate_parser.set_defaults(func=generate)
+    generate_parser.add_argument("--packets", default=packets.DEFAULT_PATH,
+                                 help="generated packets.py of the game version")
+    generate_parser.add_argument("--target", type=address, default=("127.0.0.1", DEFAULT_PORT),
+                                 help="host:port to send to")
+    generate_parser.add_argument("--rate", type=float, default=60.0,
+                                 help="frames per second, 0 for as fast as possible")
+    generate_parser.add_argument("--cars", type=int, default=synthetic.NUM_CARS)
+    generate_parser.add_argument("--sessions", type=int, default=1,
+                                 help="simultaneous sessions, each with its own session_uid")
+    generate_parser.add_argument("--duration", type=float, help="seconds to run")
+    generate_parser.add_argument("--stats-interval", type=float, default=1.0)
+    return parser
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s.%(msecs)03d %(levelname)s: %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    parser = get_parser()
+    args = parser.parse_args()
+    if args.func is receive and (args.record or args.shm or args.forward or args.metrics_port) and (
+            len(args.port) > 1 or args.workers > 1):
+        parser.error("--record, --shm, --forward and --metrics-port need a single port and worker")
+    args.func(args)
@@ -0,0 +1,187 @@
+import asyncio
+import collections
+import logging
+
+from udp.dispatch import HEADER_DISPATCH, Dispatcher
+from udp.receiver import DEFAULT_HOST, DEFAULT_PORT, DEFAULT_RCVBUF, create_socket
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop-oldest"
+DROP_NEWEST = "drop-newest"
+COALESCE = "coalesce"
+
+POLICIES = (DROP_OLDEST, DROP_NEWEST, COALESCE)
+
+
+class SubscriptionClosed(Exception):
+    """Raised by ``Subscription.get`` once the subscription is closed and empty"""
+
+
+class Subscription(object):
+    """A bounded queue of ``(packet, address)`` for one async consumer
+
+    ``put`` never blocks or awaits, so a slow consumer can only lose its own
+    packets, never stall ingest. What is lost when the queue is full depends
+    on the policy:
+
+    - ``DROP_OLDEST``: the oldest queued packet
+    - ``DROP_NEWEST``: the packet being put
+    - ``COALESCE``: a queued packet of the same type from the same address is
+      replaced by the new one in place, so the consumer always gets the
+      latest packet per type and source; only if the queue is full of other
+      types the oldest packet is dropped
+
+    Args:
+        maxsize (int):
+            - Maximum number of queued packets, at least ``1``
+        policy (str):
+            - One of ``POLICIES``
+        packet_types (iterable):
+            - Packet classes to deliver, all if omitted
+
+    """
+
+    def __init__(self, maxsize: int = 256, policy: str = DROP_OLDEST, packet_types=None):
+        if maxsize < 1:
+            raise ValueError(f"maxsize has to be at least 1, got {maxsize}")
+        if policy not in POLICIES:
+            raise ValueError(f"unknown policy {policy!r}, expected one of {POLICIES}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.packet_types = set(packet_types) if packet_types is not None else None
+        self.dropped = 0
+        self._queue = collections.deque()
+        self._latest = {}
+        self._event = asyncio.Event()
+        self._closed = False
+
+    def __len__(self):
+        return len(self._queue)
+
+    def put(self, packet, address=None):
+        """Queues ``packet``, received from ``address``, has the signature of a ``Receiver`` handler"""
+        packet_type = type(packet)
+        if self.packet_types is not None and packet_type not in self.packet_types:
+            return
+        queue = self._queue
+
+        if self.policy == COALESCE:
+            key = (packet_type, address)
+            slot = self._latest.get(key)
+            if slot is not None:
+                slot[0] = packet
+                self.dropped += 1
+                return
+            if len(queue) >= self.maxsize:
+                self._drop_oldest()
+            slot = [packet, address]
+            self._latest[key] = slot
+            queue.append(slot)
+        else:
+            if len(queue) >= self.maxsize:
+                if self.policy == DROP_NEWEST:
+                    self.dropped += 1
+                    return
+                self._drop_oldest()
+            queue.append((packet, address))
+        self._event.set()
+
+    def _drop_oldest(self):
+        item = self._queue.popleft()
+        self.dropped += 1
+        if self.policy == COALESCE:
+            del self._latest[(type(item[0]), item[1])]
+
+    async def get(self):
+        """Returns the next ``(packet, address)``, waits if there is none
+
+        Raises:
+            SubscriptionClosed: once the subscription is closed and empty
+
+        """
+        while not self._queue:
+            if self._closed:
+                raise SubscriptionClosed
+            self._event.clear()
+            await self._event.wait()
+        item = self._queue.popleft()
+        if self.policy == COALESCE:
+            del self._latest[(type(item[0]), item[1])]
+            return item[0], item[1]
+        return item
+
+    def close(self):
+        self._closed = True
+        self._event.set()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self.get()
+        except SubscriptionClosed:
+            raise StopAsyncIteration from None
+
+
+class PacketProtocol(asyncio.DatagramProtocol):
+    """Decodes datagrams with the generated packet classes and fans them out to subscriptions
+
+    Decoding and queueing happen synchronously in ``datagram_received``, so
+    ingest never waits for a consumer.
+
+    Args:
+        packets (module):
+            - A generated ``packets.py`` module
+        packet_ids (iterable):
+            - Packet ids or class names to decode, all if omitted
+
+    """
+
+    def __init__(self, packets, packet_ids=None):
+        self.dispatcher = Dispatcher(packets.HEADER_FIELD_TO_PACKET_TYPE, packet_ids)
+        self.subscriptions = []
+        self.received = 0
+        self.skipped = 0
+        self.transport = None
+
+    def subscribe(self, maxsize: int = 256, policy: str = DROP_OLDEST, packet_types=None) -> Subscription:
+        subscription = Subscription(maxsize, policy, packet_types)
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscriptions.remove(subscription)
+        subscription.close()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.received += 1
+        if len(data) < HEADER_DISPATCH.size:
+            self.skipped += 1
+            return
+        packet_type = self.dispatcher.get(data)
+        if packet_type is None or len(data) < packet_type.size():
+            self.skipped += 1
+            return
+        packet = packet_type.unpack(data)
+        for subscription in self.subscriptions:
+            subscription.put(packet, addr)
+
+    def error_received(self, exc):
+        logger.warning("UDP error: %s", exc)
+
+    def connection_lost(self, exc):
+        for subscription in self.subscriptions:
+            subscription.close()
+
+
+async def listen(packets, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, rcvbuf: int = DEFAULT_RCVBUF,
+                 packet_ids=None):
+    """Starts a ``PacketProtocol`` on a new socket and returns ``(transport, protocol)``"""
+    loop = asyncio.get_running_loop()
+    sock = create_socket(host, port, rcvbuf)
+    return await loop.create_datagram_endpoint(lambda: PacketProtocol(packets, packet_ids), sock=sock)
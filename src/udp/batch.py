@@ -0,0 +1,73 @@
+import numpy as np
+
+from udp.dispatch import PACKET_ID_OFFSET
+
+NUM_CARS = 22
+
+
+def group_by_packet_id(datagrams) -> dict:
+    """Returns the raw datagrams grouped by their ``packet_id`` byte"""
+    groups = {}
+    for datagram in datagrams:
+        groups.setdefault(datagram[PACKET_ID_OFFSET], []).append(datagram)
+    return groups
+
+
+def decode(datagrams, dtype: np.dtype) -> np.ndarray:
+    """Decodes raw datagrams of one packet type into a structured array of shape ``(frames,)``
+
+    Every datagram is copied once, into the array's contiguous buffer: the
+    datagrams are separate buffers, usually views into receive buffers that
+    are reused, so the array cannot share their memory. ``b"".join`` does
+    that copy in C, several times faster than filling a preallocated
+    buffer datagram by datagram. The fields are not copied again, the
+    array and ``columns`` are views into that buffer.
+
+    Args:
+        datagrams (list):
+            - Raw datagrams, each at least ``dtype.itemsize`` bytes long
+        dtype (np.dtype):
+            - The packet's dtype from a generated ``dtypes.py``
+
+    Raises:
+        ValueError: if a datagram is shorter than ``dtype.itemsize``
+
+    """
+    size = dtype.itemsize
+    if all(len(datagram) == size for datagram in datagrams):
+        buffer = b"".join(datagrams)
+    else:
+        for datagram in datagrams:
+            if len(datagram) < size:
+                raise ValueError(f"datagram of {len(datagram)} bytes is shorter than {size} bytes")
+        buffer = b"".join(memoryview(datagram)[:size] for datagram in datagrams)
+    return np.frombuffer(buffer, dtype=dtype)
+
+
+def columns(array: np.ndarray) -> dict:
+    """Flattens a structured array of packets into one array per field
+
+    Fields of the per-car array (``car_telemetry_data``, ``lap_data``, ...)
+    keep their name and have the shape ``(frames, 22)``, followed by the
+    field's own dimensions (e.g. ``(frames, 22, 4)`` for ``tyres_pressure``).
+    Fields of other nested structs are named ``parent.field``.
+    """
+    result = {}
+    _flatten(array, array.ndim, "", result)
+    return result
+
+
+def decode_columns(datagrams, dtype: np.dtype) -> dict:
+    """Decodes raw datagrams of one packet type straight into ``columns``"""
+    return columns(decode(datagrams, dtype))
+
+
+def _flatten(array: np.ndarray, ndim: int, prefix: str, result: dict):
+    for name in array.dtype.names:
+        column = array[name]
+        if column.dtype.names is None:
+            result[prefix + name] = column
+        elif column.ndim == ndim + 1 and column.shape[-1] == NUM_CARS:
+            _flatten(column, column.ndim, prefix, result)
+        else:
+            _flatten(column, column.ndim, f"{prefix}{name}.", result)
@@ -0,0 +1,78 @@
+import collections
+import ctypes
+
+MAX_DATAGRAM_SIZE = 2048
+
+
+class BufferPoolExhausted(Exception):
+    pass
+
+
+class BufferPool(object):
+    """A fixed set of receive buffers carved out of one preallocated slab
+
+    Packets unpacked with ``copy=False`` from a buffer of the pool stay valid
+    until they are handed back with ``release``. Buffers are reused in the
+    order they were released.
+
+    Args:
+        count (int):
+            - Number of buffers
+        size (int):
+            - Size of a single buffer in bytes
+
+    """
+
+    def __init__(self, count: int = 256, size: int = MAX_DATAGRAM_SIZE):
+        self.count = count
+        self.size = size
+        self._slab = bytearray(count * size)
+        slab_view = memoryview(self._slab)
+        self._buffers = [slab_view[i * size:(i + 1) * size] for i in range(count)]
+        self._address = ctypes.addressof(ctypes.c_char.from_buffer(self._slab))
+        self._free = collections.deque(range(count))
+        # 1 for every buffer that is acquired and not released yet
+        self._in_use = bytearray(count)
+
+    def __len__(self):
+        """Returns the number of free buffers"""
+        return len(self._free)
+
+    def acquire(self) -> int:
+        """Returns the index of a free buffer
+
+        Raises:
+            BufferPoolExhausted: if every buffer is still in use
+
+        """
+        try:
+            index = self._free.popleft()
+        except IndexError:
+            raise BufferPoolExhausted(f"all {self.count} buffers are in use") from None
+        self._in_use[index] = 1
+        return index
+
+    def buffer(self, index: int) -> memoryview:
+        return self._buffers[index]
+
+    def index_of(self, packet) -> int:
+        """Returns the index of the buffer ``packet`` is a view of"""
+        offset = ctypes.addressof(packet) - self._address
+        if not 0 <= offset < len(self._slab):
+            raise ValueError("packet is not a view of this pool")
+        return offset // self.size
+
+    def release(self, item):
+        """Hands a buffer back to the pool, either by index or by a packet viewing it
+
+        Raises:
+            ValueError: if the buffer is not in use, e.g. released twice, or not of this pool
+
+        """
+        index = item if isinstance(item, int) else self.index_of(item)
+        if not 0 <= index < self.count:
+            raise ValueError(f"buffer {index} is not of this pool")
+        if not self._in_use[index]:
+            raise ValueError(f"buffer {index} is not in use")
+        self._in_use[index] = 0
+        self._free.append(index)
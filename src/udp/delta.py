@@ -0,0 +1,199 @@
+import ctypes
+import re
+import struct
+
+from udp.dispatch import HEADER_STREAM, Dispatcher
+
+KEYFRAME = b"K"
+DELTA = b"D"
+
+# kind, packet_id, session_uid, sequence number of the stream
+MESSAGE_HEADER = struct.Struct("<cBQH")
+# offset, length of a run of changed bytes, followed by the bytes
+RUN_HEADER = struct.Struct("<HB")
+MAX_RUN = 255
+
+DEFAULT_KEYFRAME_INTERVAL = 60
+
+# runs of changed bytes, including gaps too short to be worth a run header of their own
+_CHANGED = re.compile(b"[^\x00](?:[^\x00]|\x00{1,%d}(?=[^\x00]))*" % RUN_HEADER.size)
+
+
+class DeltaError(Exception):
+    """Raised by ``DeltaDecoder.decode`` for a delta whose base is missing"""
+
+
+def field_offsets(packet_type, base: int = 0) -> list:
+    """Returns the start offsets of the leaf fields of ``packet_type``, arrays expanded to their elements
+
+    Strings (``c_char`` arrays) count as one field.
+    """
+    offsets = []
+    for name, field_type in packet_type._fields_:
+        offset = base + getattr(packet_type, name).offset
+        _leaf_offsets(field_type, offset, offsets)
+    return offsets
+
+
+def _leaf_offsets(field_type, offset: int, offsets: list):
+    if issubclass(field_type, ctypes.Array) and field_type._type_ is not ctypes.c_char:
+        size = ctypes.sizeof(field_type._type_)
+        for i in range(field_type._length_):
+            _leaf_offsets(field_type._type_, offset + i * size, offsets)
+    elif issubclass(field_type, ctypes.Structure):
+        offsets.extend(field_offsets(field_type, offset))
+    else:
+        offsets.append(offset)
+
+
+class DeltaEncoder(object):
+    """Encodes datagrams as the fields that changed since the previous datagram of the same stream
+
+    A stream is the datagrams of one ``packet_id`` of one ``session_uid``.
+    The first datagram of a stream, every ``keyframe_interval``-th and every
+    one whose length changed is sent whole as a keyframe, so a decoder can
+    start or recover from lost messages. Deltas are runs of changed bytes,
+    widened to whole fields of the generated classes' layout and merged
+    when the gap between them is shorter than a run header. Datagrams too
+    short for a ``PacketHeader`` stream key are not encoded; ``skipped``
+    counts them.
+
+    Args:
+        packets (module):
+            - A generated ``packets.py`` module, for the field layouts
+        keyframe_interval (int):
+            - Datagrams per stream between two keyframes
+
+    """
+
+    def __init__(self, packets, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.dispatcher = Dispatcher(packets.HEADER_FIELD_TO_PACKET_TYPE)
+        self.skipped = 0
+        self._fields = {}
+        self._streams = {}
+
+    def encode(self, datagram) -> bytes:
+        """Returns the message of ``datagram``, a keyframe or a delta, None if it is too short to be a packet"""
+        if len(datagram) < HEADER_STREAM.size:
+            self.skipped += 1
+            return None
+        datagram = bytes(datagram)
+        packet_id, session_uid = HEADER_STREAM.unpack_from(datagram)
+        key = (session_uid, packet_id)
+        stream = self._streams.get(key)
+
+        if stream is None or stream[1] + 1 >= self.keyframe_interval or len(stream[0]) != len(datagram):
+            sequence = 0 if stream is None else (stream[2] + 1) & 0xFFFF
+            self._streams[key] = [datagram, 0, sequence]
+            return MESSAGE_HEADER.pack(KEYFRAME, packet_id, session_uid, sequence) + datagram
+
+        previous = stream[0]
+        sequence = (stream[2] + 1) & 0xFFFF
+        stream[0] = datagram
+        stream[1] += 1
+        stream[2] = sequence
+
+        n = len(datagram)
+        changed = (int.from_bytes(previous, "little") ^ int.from_bytes(datagram, "little")).to_bytes(n, "little")
+        starts, ends = self._field_bounds(datagram)
+        parts = [MESSAGE_HEADER.pack(DELTA, packet_id, session_uid, sequence)]
+        pack_run = RUN_HEADER.pack
+        gap = RUN_HEADER.size
+        run_start = run_end = -gap - 1
+        for match in _CHANGED.finditer(changed):
+            start, end = match.span()
+            # widen to the fields the changed bytes belong to
+            start = starts[start]
+            end = ends[end - 1]
+            if start - run_end <= gap:
+                if end > run_end:
+                    run_end = end
+                continue
+            if run_end > 0:
+                if run_end - run_start <= MAX_RUN:
+                    parts.append(pack_run(run_start, run_end - run_start))
+                    parts.append(datagram[run_start:run_end])
+                else:
+                    _append_long_run(parts, datagram, run_start, run_end)
+            run_start, run_end = start, end
+        if run_end > 0:
+            _append_long_run(parts, datagram, run_start, run_end)
+        return b"".join(parts)
+
+    def _field_bounds(self, datagram) -> tuple:
+        """Returns the start and end offset of the field of every byte of ``datagram``"""
+        packet_type = self.dispatcher.get(datagram)
+        key = (packet_type, len(datagram))
+        bounds = self._fields.get(key)
+        if bounds is None:
+            n = len(datagram)
+            starts = list(range(n))
+            ends = list(range(1, n + 1))
+            if packet_type is not None:
+                offsets = field_offsets(packet_type) + [ctypes.sizeof(packet_type)]
+                for start, end in zip(offsets, offsets[1:]):
+                    for i in range(start, min(end, n)):
+                        starts[i] = start
+                        ends[i] = min(end, n)
+            bounds = self._fields[key] = (starts, ends)
+        return bounds
+
+    def reset(self, session_uid: int = None):
+        """Starts the streams of ``session_uid``, or of all sessions, with a keyframe again"""
+        if session_uid is None:
+            self._streams.clear()
+            return
+        for key in [key for key in self._streams if key[0] == session_uid]:
+            del self._streams[key]
+
+
+def _append_long_run(parts: list, datagram: bytes, start: int, end: int):
+    while start < end:
+        length = min(end - start, MAX_RUN)
+        parts.append(RUN_HEADER.pack(start, length))
+        parts.append(datagram[start:start + length])
+        start += length
+
+
+class DeltaDecoder(object):
+    """Restores the datagrams of a ``DeltaEncoder``
+
+    Deltas of a stream whose previous message was lost are rejected until
+    its next keyframe; ``missed`` counts them.
+    """
+
+    def __init__(self):
+        self.missed = 0
+        self._streams = {}
+
+    def decode(self, message) -> bytes:
+        """Returns the datagram of ``message``
+
+        Raises:
+            DeltaError: if the delta's base, the previous message of its stream, is missing
+
+        """
+        kind, packet_id, session_uid, sequence = MESSAGE_HEADER.unpack_from(message)
+        key = (session_uid, packet_id)
+        body = memoryview(message)[MESSAGE_HEADER.size:]
+        if kind == KEYFRAME:
+            self._streams[key] = [bytearray(body), sequence]
+            return bytes(body)
+        if kind != DELTA:
+            raise ValueError(f"unknown message kind {kind!r}")
+
+        stream = self._streams.get(key)
+        if stream is None or stream[1] != (sequence - 1) & 0xFFFF:
+            self.missed += 1
+            self._streams.pop(key, None)
+            raise DeltaError(f"missing base of delta {sequence} of packet {packet_id} of session {session_uid}")
+        datagram = stream[0]
+        stream[1] = sequence
+        position = 0
+        while position < len(body):
+            start, length = RUN_HEADER.unpack_from(body, position)
+            position += RUN_HEADER.size
+            datagram[start:start + length] = body[position:position + length]
+            position += length
+        return bytes(datagram)
@@ -0,0 +1,69 @@
+import struct
+
+# The PacketHeader of F1 23 and F1 24 (packet_format 2023 and 2024): packet_format, game_year,
+# game_major_version, game_minor_version, packet_version, packet_id, session_uid, session_time,
+# frame_identifier, overall_frame_identifier, player_car_index, secondary_player_car_index.
+# The header fields below are read from raw datagrams at the offsets of this layout. The F1 22
+# header (data/F122) has no game_year, so every field after packet_format sits one byte earlier
+# there, and no overall_frame_identifier; its datagrams need offsets of their own.
+PACKET_HEADER = struct.Struct("<HBBBBBQfIIBB")
+
+# packet_format, packet_version, packet_id
+HEADER_DISPATCH = struct.Struct("<H3xBB")
+PACKET_ID_OFFSET = 6
+# packet_id, session_uid
+HEADER_STREAM = struct.Struct("<6xBQ")
+# session_uid
+HEADER_SESSION_UID = struct.Struct("<7xQ")
+# session_uid, frame_identifier
+HEADER_SESSION_FRAME = struct.Struct("<7xQ4xI")
+# session_uid, frame_identifier, overall_frame_identifier
+HEADER_FRAME = struct.Struct("<7xQ4xII")
+# packet_id, session_uid, session_time, overall_frame_identifier
+HEADER_SEQUENCE = struct.Struct("<6xBQf4xI")
+# packet_id, session_uid, overall_frame_identifier
+HEADER_INDEX_FIELDS = struct.Struct("<6xBQ8xI")
+
+
+class Dispatcher(object):
+    """Finds the packet class of a raw datagram without constructing a ``PacketHeader``
+
+    For every ``(packet_format, packet_version)`` a table of 256 entries is
+    indexed by the ``packet_id`` byte, so rejecting a datagram costs one
+    ``struct.unpack_from`` and two lookups.
+
+    Args:
+        packet_types (dict):
+            - ``HEADER_FIELD_TO_PACKET_TYPE`` of a generated ``packets.py``
+        packet_ids (iterable):
+            - Packet ids or class names to dispatch, all if omitted
+
+    """
+
+    def __init__(self, packet_types: dict, packet_ids=None):
+        if packet_ids is not None:
+            packet_ids = set(packet_ids)
+        self._types = {}
+        for (packet_format, packet_version, packet_id), packet_type in packet_types.items():
+            if packet_ids is not None and packet_id not in packet_ids and packet_type.__name__ not in packet_ids:
+                continue
+            key = (packet_format, packet_version)
+            self._types.setdefault(key, [None] * 256)[packet_id] = packet_type
+
+    def packet_types(self):
+        """Returns the dispatched packet classes"""
+        return [t for types in self._types.values() for t in types if t is not None]
+
+    def get(self, buffer):
+        """Returns the packet class of ``buffer``, ``None`` if it is unknown or filtered
+
+        Args:
+            buffer (bytes):
+                - The raw datagram, at least ``HEADER_DISPATCH.size`` bytes
+
+        """
+        packet_format, packet_version, packet_id = HEADER_DISPATCH.unpack_from(buffer)
+        types = self._types.get((packet_format, packet_version))
+        if types is None:
+            return None
+        return types[packet_id]
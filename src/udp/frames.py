@@ -0,0 +1,157 @@
+import time
+
+from udp.dispatch import HEADER_FRAME
+
+DEFAULT_REQUIRED = ("PacketMotionData", "PacketLapData", "PacketCarTelemetryData", "PacketCarStatusData")
+DEFAULT_TIMEOUT = 0.05
+DEFAULT_MAX_PENDING = 32
+
+
+class Frame(object):
+    """The packets of one frame of one session
+
+    Attributes:
+        session_uid (int):
+            - ``PacketHeader.session_uid``
+        frame_identifier (int):
+            - ``PacketHeader.frame_identifier``, rewinds after flashbacks
+        overall_frame_identifier (int):
+            - ``PacketHeader.overall_frame_identifier``, the frame's key
+        packets (dict):
+            - The latest packet of every class name of the frame
+        extra (list):
+            - Every packet of the classes that are not required, like car
+              damage, session history or events, in arrival order
+        missing (set):
+            - Required class names without a packet, empty if complete
+
+    """
+
+    def __init__(self, session_uid: int, frame_identifier: int, overall_frame_identifier: int, required: frozenset,
+                 created: float):
+        self.session_uid = session_uid
+        self.frame_identifier = frame_identifier
+        self.overall_frame_identifier = overall_frame_identifier
+        self.packets = {}
+        self.extra = []
+        self.missing = set(required)
+        self.created = created
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing
+
+    def __getitem__(self, name: str):
+        return self.packets[name]
+
+    def get(self, name: str, default=None):
+        return self.packets.get(name, default)
+
+
+class FrameAssembler(object):
+    """Groups the packets of a simulation tick into one ``Frame``
+
+    A frame is closed and passed to ``on_frame`` once a newer frame of its
+    session starts and every ``required`` packet class arrived, or once it
+    is older than ``timeout`` seconds. Until then the packets of other
+    classes the game sends in the same tick are added to it. Frames of a
+    session are passed in order: a frame waits for the older frames of its
+    session to close. Packets of a frame that was already closed are counted
+    as ``late`` and dropped; a packet of a required class the frame already
+    has replaces it and counts as ``duplicates``.
+
+    ``add`` has the signature of a ``Receiver`` handler. Packets are kept
+    until their frame is passed on, so they must not be views into buffers
+    that are reused, e.g. of ``Receiver`` batches.
+
+    Args:
+        on_frame (callable):
+            - Called with every ``Frame``
+        required (iterable):
+            - Class names of the packets of a complete frame
+        timeout (float):
+            - Seconds after its first packet an incomplete frame is passed on
+        max_pending (int):
+            - Frames waiting at most, the oldest are passed on incomplete beyond
+        clock (callable):
+            - Returns the current time in seconds
+
+    """
+
+    def __init__(self, on_frame, required=DEFAULT_REQUIRED, timeout: float = DEFAULT_TIMEOUT,
+                 max_pending: int = DEFAULT_MAX_PENDING, clock=time.monotonic):
+        self.on_frame = on_frame
+        self.required = frozenset(required)
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.clock = clock
+        self.stats = {"complete": 0, "incomplete": 0, "late": 0, "duplicates": 0}
+        # insertion ordered, so the first frame is the oldest
+        self._pending = {}
+        # latest overall_frame_identifier passed on per session
+        self._emitted = {}
+
+    def add(self, packet, address=None):
+        session_uid, frame_identifier, overall_frame_identifier = HEADER_FRAME.unpack_from(packet)
+        now = self.clock()
+        key = (session_uid, overall_frame_identifier)
+        frame = self._pending.get(key)
+        if frame is None:
+            emitted = self._emitted.get(session_uid)
+            if emitted is not None and overall_frame_identifier <= emitted:
+                self.stats["late"] += 1
+                self.expire(now)
+                return
+            frame = self._pending[key] = Frame(
+                session_uid, frame_identifier, overall_frame_identifier, self.required, now)
+            # a new frame closes the complete older frames of its session
+            self._release(session_uid, now, newer=overall_frame_identifier)
+
+        name = type(packet).__name__
+        if name in self.required:
+            if name in frame.packets:
+                self.stats["duplicates"] += 1
+            frame.missing.discard(name)
+        else:
+            frame.extra.append(packet)
+        frame.packets[name] = packet
+        self.expire(now)
+
+    def expire(self, now: float = None):
+        """Passes on the frames that timed out or exceed ``max_pending``
+
+        ``add`` calls it, call it regularly as well if packets may stop arriving.
+        """
+        if not self._pending:
+            return
+        if now is None:
+            now = self.clock()
+        pending = self._pending
+        while pending:
+            frame = next(iter(pending.values()))
+            if now - frame.created < self.timeout and len(pending) <= self.max_pending:
+                return
+            self._release(frame.session_uid, now, frame.overall_frame_identifier)
+
+    def flush(self):
+        """Passes on all pending frames"""
+        while self._pending:
+            frame = next(iter(self._pending.values()))
+            self._release(frame.session_uid, self.clock(), frame.overall_frame_identifier)
+
+    def _release(self, session_uid: int, now: float, until: int = -1, newer: int = -1):
+        """Passes on the frames of ``session_uid`` in order up to the first one that is still open
+
+        Frames up to the ``overall_frame_identifier`` ``until`` are passed on in
+        any case, complete frames before ``newer`` as well.
+        """
+        pending = self._pending
+        for key in sorted(key for key in pending if key[0] == session_uid):
+            frame = pending[key]
+            if (key[1] > until and (key[1] >= newer or frame.missing)
+                    and now - frame.created < self.timeout):
+                return
+            del pending[key]
+            self._emitted[session_uid] = key[1]
+            self.stats["complete" if frame.complete else "incomplete"] += 1
+            self.on_frame(frame)
@@ -0,0 +1,192 @@
+import http.server
+import threading
+import time
+
+from udp.dispatch import HEADER_SEQUENCE
+
+# Packets sent irregularly or several times per frame, no gaps or duplicates are counted for them:
+# event, session history and tyre sets
+UNSEQUENCED_PACKET_IDS = frozenset((3, 11, 12))
+
+# Upper bounds of the decode time histogram in seconds
+DECODE_BUCKETS = (1e-6, 2e-6, 5e-6, 10e-6, 20e-6, 50e-6, 100e-6, 200e-6, 500e-6, 1e-3)
+
+DEFAULT_METRICS_HOST = "127.0.0.1"
+
+
+class SourceMetrics(object):
+    """Counters of the datagrams of one session from one source address
+
+    Gaps, reordering and duplicates are counted per packet id on
+    ``overall_frame_identifier``. A packet id that is not sent every frame
+    advances by more than one frame per packet, so a gap is a step larger
+    than the smallest step seen for it. Jitter is the interarrival jitter of
+    RFC 3550, with ``session_time`` as the send time, in seconds.
+    """
+
+    def __init__(self):
+        self.packets = 0
+        self.lost = 0
+        self.out_of_order = 0
+        self.duplicates = 0
+        self.jitter = 0.0
+        self._transit = None
+        # packet_id -> [latest overall_frame_identifier, smallest step]
+        self._frames = {}
+
+    def observe(self, packet_id: int, session_time: float, overall_frame: int, arrival: float):
+        self.packets += 1
+
+        transit = arrival - session_time
+        if self._transit is not None:
+            self.jitter += (abs(transit - self._transit) - self.jitter) / 16
+        self._transit = transit
+
+        if packet_id in UNSEQUENCED_PACKET_IDS:
+            return
+        frames = self._frames.get(packet_id)
+        if frames is None:
+            self._frames[packet_id] = [overall_frame, None]
+            return
+        step = overall_frame - frames[0]
+        if step < 0:
+            self.out_of_order += 1
+            return
+        if step == 0:
+            self.duplicates += 1
+            return
+        smallest = frames[1]
+        if smallest is None or step < smallest:
+            frames[1] = smallest = step
+        elif step >= 2 * smallest:
+            self.lost += round(step / smallest) - 1
+        frames[0] = overall_frame
+
+    def to_dict(self) -> dict:
+        return {
+            "packets": self.packets,
+            "lost": self.lost,
+            "out_of_order": self.out_of_order,
+            "duplicates": self.duplicates,
+            "jitter_ms": round(self.jitter * 1000, 3),
+        }
+
+
+class Histogram(object):
+    """Cumulative histogram with fixed bucket bounds, like Prometheus'"""
+
+    def __init__(self, buckets=DECODE_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics(object):
+    """Network and decoder metrics per source address and ``session_uid``
+
+    Pass it to ``Receiver(metrics=...)`` to observe every datagram and
+    every decode. ``to_prometheus`` renders the Prometheus text format,
+    ``serve`` makes it available over HTTP.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.sources = {}
+        self.decode = {}
+
+    def observe(self, datagram, address):
+        """Counts ``datagram``, has the signature of a raw ``Receiver`` handler"""
+        if len(datagram) < HEADER_SEQUENCE.size:
+            return
+        packet_id, session_uid, session_time, overall_frame = HEADER_SEQUENCE.unpack_from(datagram)
+        key = (address, session_uid)
+        source = self.sources.get(key)
+        if source is None:
+            source = self.sources[key] = SourceMetrics()
+        source.observe(packet_id, session_time, overall_frame, self.clock())
+
+    def observe_decode(self, packet_type, seconds: float):
+        histogram = self.decode.get(packet_type.__name__)
+        if histogram is None:
+            histogram = self.decode[packet_type.__name__] = Histogram()
+        histogram.observe(seconds)
+
+    def to_dict(self) -> dict:
+        return {
+            "sources": {
+                f"{_format_address(address)}/{session_uid}": source.to_dict()
+                for (address, session_uid), source in list(self.sources.items())
+            },
+            "decode": {
+                name: {"count": histogram.count, "avg_us": round(histogram.sum / histogram.count * 1e6, 2)}
+                for name, histogram in list(self.decode.items()) if histogram.count
+            },
+        }
+
+    def to_prometheus(self) -> str:
+        """Returns the metrics in the Prometheus text exposition format"""
+        lines = []
+        sources = list(self.sources.items())
+        for name, attribute, kind, description in (
+                ("f1_udp_packets_total", "packets", "counter", "Datagrams received"),
+                ("f1_udp_lost_total", "lost", "counter", "Datagrams missing in the frame sequence"),
+                ("f1_udp_out_of_order_total", "out_of_order", "counter", "Datagrams older than their predecessor"),
+                ("f1_udp_duplicates_total", "duplicates", "counter", "Datagrams of a frame received again"),
+                ("f1_udp_jitter_seconds", "jitter", "gauge", "Interarrival jitter (RFC 3550)")):
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (address, session_uid), source in sources:
+                labels = f'source="{_format_address(address)}",session_uid="{session_uid}"'
+                lines.append(f"{name}{{{labels}}} {getattr(source, attribute)}")
+
+        name = "f1_udp_decode_seconds"
+        lines.append(f"# HELP {name} Time to decode a datagram")
+        lines.append(f"# TYPE {name} histogram")
+        for packet, histogram in list(self.decode.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{packet="{packet}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{packet="{packet}"}} {histogram.sum}')
+            lines.append(f'{name}_count{{packet="{packet}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = DEFAULT_METRICS_HOST) -> http.server.HTTPServer:
+        """Serves ``to_prometheus`` at ``/metrics`` from a daemon thread and returns the server"""
+        metrics = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        return server
+
+
+def _format_address(address) -> str:
+    if address is None:
+        return ""
+    return f"{address[0]}:{address[1]}"
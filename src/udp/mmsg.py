@@ -0,0 +1,296 @@
+import ctypes
+import errno
+import os
+import select
+import socket
+import sys
+
+from udp.buffers import MAX_DATAGRAM_SIZE
+
+
+class iovec(ctypes.Structure):
+    _fields_ = [
+        ("iov_base", ctypes.c_void_p),
+        ("iov_len", ctypes.c_size_t),
+    ]
+
+
+class msghdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(iovec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class mmsghdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_hdr", msghdr),
+        ("msg_len", ctypes.c_uint),
+    ]
+
+
+# sizeof(struct sockaddr_storage)
+SOCKADDR_SIZE = 128
+MSG_DONTWAIT = 0x40
+MSG_TRUNC = 0x20
+# parsed source addresses kept, there are few sources
+ADDRESS_CACHE_SIZE = 1024
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, "sendmmsg") or not hasattr(libc, "recvmmsg"):
+        return None
+    libc.sendmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(mmsghdr), ctypes.c_uint, ctypes.c_int]
+    libc.sendmmsg.restype = ctypes.c_int
+    libc.recvmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(mmsghdr), ctypes.c_uint, ctypes.c_int, ctypes.c_void_p]
+    libc.recvmmsg.restype = ctypes.c_int
+    return libc
+
+
+_libc = _load_libc()
+
+HAVE_SENDMMSG = HAVE_RECVMMSG = _libc is not None
+
+
+class MessageBatch(object):
+    """Preallocated ``mmsghdr`` array and buffer slab for sending many datagrams per syscall
+
+    Uses ``sendmmsg`` on Linux and one ``send`` per datagram elsewhere. The
+    socket has to be connected to its target. Like the game, the sender does
+    not care whether anyone listens: ``ECONNREFUSED`` reported for earlier
+    datagrams is ignored.
+
+    Args:
+        count (int):
+            - Maximum number of datagrams per batch
+        size (int):
+            - Maximum size of a datagram
+
+    """
+
+    def __init__(self, count: int = 64, size: int = MAX_DATAGRAM_SIZE):
+        self.count = count
+        self.size = size
+        self._slab = (ctypes.c_char * (count * size))()
+        self._iovecs = (iovec * count)()
+        self._messages = (mmsghdr * count)()
+        address = ctypes.addressof(self._slab)
+        for i in range(count):
+            self._iovecs[i].iov_base = address + i * size
+            message = self._messages[i].msg_hdr
+            message.msg_iov = ctypes.pointer(self._iovecs[i])
+            message.msg_iovlen = 1
+
+    def send(self, sock, datagrams) -> int:
+        """Sends up to ``count`` datagrams and returns how many were sent
+
+        Raises:
+            ValueError: if a datagram is larger than ``size``, before any datagram is sent
+
+        """
+        datagrams = datagrams[:self.count]
+        for datagram in datagrams:
+            if len(datagram) > self.size:
+                raise ValueError(f"datagram of {len(datagram)} bytes is larger than the batch's {self.size} bytes")
+        if _libc is None:
+            for datagram in datagrams:
+                try:
+                    sock.send(datagram)
+                except ConnectionRefusedError:
+                    pass
+            return len(datagrams)
+
+        slab = memoryview(self._slab).cast("B")
+        for i, datagram in enumerate(datagrams):
+            n = len(datagram)
+            start = i * self.size
+            slab[start:start + n] = datagram
+            self._iovecs[i].iov_len = n
+
+        sent = 0
+        fd = sock.fileno()
+        while sent < len(datagrams):
+            result = _libc.sendmmsg(fd, ctypes.byref(self._messages[sent]), len(datagrams) - sent, 0)
+            if result < 0:
+                error = ctypes.get_errno()
+                if error == errno.ECONNREFUSED:
+                    continue
+                raise OSError(error, os.strerror(error))
+            sent += result
+        return sent
+
+
+class ReceiveBatch(object):
+    """Preallocated ``mmsghdr`` array and buffer slab for receiving many datagrams per syscall
+
+    Uses ``recvmmsg`` on Linux and a loop of ``recvfrom_into`` elsewhere.
+    ``receive`` waits for the first datagram like ``socket.recvfrom`` would,
+    honouring the socket's timeout, and then takes what else is already
+    queued without waiting. The datagrams are views into the slab, valid
+    until the next ``receive``. Datagrams larger than ``size`` are cut off,
+    ``truncated`` tells which ones.
+
+    Args:
+        count (int):
+            - Maximum number of datagrams per batch
+        size (int):
+            - Maximum size of a datagram
+
+    """
+
+    def __init__(self, count: int = 64, size: int = MAX_DATAGRAM_SIZE):
+        self.count = count
+        self.size = size
+        self._slab = (ctypes.c_char * (count * size))()
+        self._view = memoryview(self._slab).cast("B")
+        self._names = (ctypes.c_char * (count * SOCKADDR_SIZE))()
+        self._iovecs = (iovec * count)()
+        self._messages = (mmsghdr * count)()
+        # msg_namelen and msg_len as uint32 words, much cheaper to access than the ctypes fields
+        self._words = memoryview(self._messages).cast("B").cast("I")
+        self._stride = ctypes.sizeof(mmsghdr) // 4
+        self._namelen = (mmsghdr.msg_hdr.offset + msghdr.msg_namelen.offset) // 4
+        self._msg_len = mmsghdr.msg_len.offset // 4
+        self._msg_flags = (mmsghdr.msg_hdr.offset + msghdr.msg_flags.offset) // 4
+        self._names_view = memoryview(self._names).cast("B")
+        self._received = 0
+        self._names_bytes = None
+        self._lengths = [0] * count
+        self._truncated = [False] * count
+        self._addresses = [None] * count
+        self._address_cache = {}
+        address = ctypes.addressof(self._slab)
+        names = ctypes.addressof(self._names)
+        for i in range(count):
+            self._iovecs[i].iov_base = address + i * size
+            self._iovecs[i].iov_len = size
+            message = self._messages[i].msg_hdr
+            message.msg_name = names + i * SOCKADDR_SIZE
+            message.msg_namelen = SOCKADDR_SIZE
+            message.msg_iov = ctypes.pointer(self._iovecs[i])
+            message.msg_iovlen = 1
+
+    def receive(self, sock) -> int:
+        """Waits for datagrams and returns how many were received, rarely ``0``
+
+        Raises:
+            socket.timeout: if no datagram arrived within the socket's timeout
+
+        """
+        if _libc is None:
+            return self._receive_loop(sock)
+
+        messages = self._messages
+        words = self._words
+        stride = self._stride
+        namelen = self._namelen
+        for i in range(self._received):
+            words[i * stride + namelen] = SOCKADDR_SIZE
+        self._received = 0
+        fd = sock.fileno()
+        waited = False
+        while True:
+            # under load datagrams are already queued, only poll when there are none
+            n = _libc.recvmmsg(fd, messages, self.count, MSG_DONTWAIT, None)
+            if n >= 0:
+                break
+            error = ctypes.get_errno()
+            if error == errno.EINTR:
+                continue
+            if error not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                raise OSError(error, os.strerror(error))
+            if waited:
+                return 0
+            timeout = sock.gettimeout()
+            if timeout == 0 or not select.select([sock], [], [], timeout)[0]:
+                raise socket.timeout("timed out")
+            waited = True
+        lengths = self._lengths
+        truncated = self._truncated
+        msg_len = self._msg_len
+        msg_flags = self._msg_flags
+        for i in range(n):
+            lengths[i] = words[i * stride + msg_len]
+            truncated[i] = words[i * stride + msg_flags] & MSG_TRUNC != 0
+        self._received = n
+        self._names_bytes = None
+        return n
+
+    def _receive_into(self, sock, i: int):
+        start = i * self.size
+        buffer = self._view[start:start + self.size]
+        if hasattr(sock, "recvmsg_into"):
+            self._lengths[i], _, flags, self._addresses[i] = sock.recvmsg_into([buffer])
+            self._truncated[i] = flags & socket.MSG_TRUNC != 0
+        else:
+            self._lengths[i], self._addresses[i] = sock.recvfrom_into(buffer)
+
+    def _receive_loop(self, sock) -> int:
+        self._receive_into(sock, 0)
+        timeout = sock.gettimeout()
+        sock.settimeout(0)
+        n = 1
+        try:
+            while n < self.count:
+                self._receive_into(sock, n)
+                n += 1
+        except BlockingIOError:
+            pass
+        finally:
+            sock.settimeout(timeout)
+        return n
+
+    def datagram(self, i: int) -> memoryview:
+        """Returns the ``i``-th datagram of the last ``receive``"""
+        start = i * self.size
+        return self._view[start:start + self._lengths[i]]
+
+    def datagrams(self, n: int) -> list:
+        """Returns the first ``n`` datagrams of the last ``receive``"""
+        view = self._view
+        size = self.size
+        lengths = self._lengths
+        return [view[i * size:i * size + lengths[i]] for i in range(n)]
+
+    def truncated(self, i: int) -> bool:
+        """Returns whether the ``i``-th datagram of the last ``receive`` was larger than ``size`` and is cut off"""
+        return self._truncated[i]
+
+    def address(self, i: int) -> tuple:
+        """Returns the source address of the ``i``-th datagram of the last ``receive`` like ``recvfrom`` does"""
+        if _libc is None:
+            return self._addresses[i]
+        names = self._names_bytes
+        if names is None:
+            names = self._names_bytes = self._names_view[:self._received * SOCKADDR_SIZE].tobytes()
+        start = i * SOCKADDR_SIZE
+        name = names[start:start + self._words[i * self._stride + self._namelen]]
+        address = self._address_cache.get(name)
+        if address is None:
+            if len(self._address_cache) >= ADDRESS_CACHE_SIZE:
+                self._address_cache.clear()
+            address = self._address_cache[name] = _parse_sockaddr(name)
+        return address
+
+
+def _parse_sockaddr(name: bytes) -> tuple:
+    family = int.from_bytes(name[0:2], sys.byteorder)
+    port = int.from_bytes(name[2:4], "big")
+    if family == socket.AF_INET:
+        return socket.inet_ntop(socket.AF_INET, name[4:8]), port
+    if family == socket.AF_INET6:
+        flowinfo = int.from_bytes(name[4:8], "big")
+        scope_id = int.from_bytes(name[24:28], sys.byteorder)
+        return socket.inet_ntop(socket.AF_INET6, name[8:24]), port, flowinfo, scope_id
+    return None
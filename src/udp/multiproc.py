@@ -0,0 +1,192 @@
+import logging
+import multiprocessing
+import queue
+import signal
+import time
+
+from udp import packets
+from udp.dispatch import HEADER_SESSION_UID
+from udp.receiver import DEFAULT_HOST, DEFAULT_RCVBUF, Receiver, create_socket
+from udp.sampling import Sampler
+
+logger = logging.getLogger(__name__)
+
+
+def _worker(index: int, packets_path: str, host: str, port: int, rcvbuf: int, reuse_port: bool,
+            stats_interval: float, packet_ids, handler_factory, batch_size: int, sample: dict, stats_queue,
+            stop_event):
+    # the parent handles Ctrl+C and stops the workers with stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # the parent stops reading on shutdown, do not block exiting on unsent stats
+    stats_queue.cancel_join_thread()
+    packets_module = packets.load(packets_path)
+    sock = create_socket(host, port, rcvbuf, reuse_port)
+    sessions = {}
+
+    def count_session(datagram, address):
+        if len(datagram) >= HEADER_SESSION_UID.size:
+            uid, = HEADER_SESSION_UID.unpack_from(datagram)
+            sessions[uid] = sessions.get(uid, 0) + 1
+
+    def on_stats(stats: dict):
+        stats["worker"] = index
+        stats["sessions"] = dict(sessions)
+        sessions.clear()
+        stats_queue.put(stats)
+        if stop_event.is_set():
+            receiver.stop()
+
+    sampler = Sampler(sample, packets_module) if sample else None
+    receiver = Receiver(packets_module, sock, stats_interval, on_stats, packet_ids=packet_ids, batch_size=batch_size,
+                        sampler=sampler)
+    receiver.add_raw_handler(count_session)
+    if handler_factory is not None:
+        receiver.add_handler(handler_factory(index))
+    try:
+        receiver.run()
+    finally:
+        receiver.close()
+
+
+def merge_stats(reports: list, elapsed: float) -> dict:
+    """Returns the stats of all workers' ``reports`` of one interval as one ``dict``
+
+    ``packets_per_second`` is computed from the packet counts over ``elapsed``,
+    the parent's interval, as the workers' intervals are not aligned.
+    """
+    merged = {
+        "workers": len({report["worker"] for report in reports}),
+        "packets": {},
+        "sessions": {},
+        "skipped": 0,
+        "malformed": 0,
+        "sampled": 0,
+        "pool_exhausted": 0,
+        "kernel_drops": None,
+        "decode_avg_us": 0.0,
+        "decode_max_us": 0.0,
+    }
+    decode_us = 0.0
+    for report in reports:
+        for name, count in report["packets"].items():
+            merged["packets"][name] = merged["packets"].get(name, 0) + count
+        for uid, count in report["sessions"].items():
+            merged["sessions"][uid] = merged["sessions"].get(uid, 0) + count
+        for key in ("skipped", "malformed", "sampled", "pool_exhausted"):
+            merged[key] += report[key]
+        if report["kernel_drops"] is not None:
+            merged["kernel_drops"] = (merged["kernel_drops"] or 0) + report["kernel_drops"]
+        decode_us += report["decode_avg_us"] * sum(report["packets"].values())
+        merged["decode_max_us"] = max(merged["decode_max_us"], report["decode_max_us"])
+
+    count = sum(merged["packets"].values())
+    merged["packets_per_second"] = round(count / elapsed, 1) if elapsed > 0 else 0.0
+    merged["packets"] = dict(sorted(merged["packets"].items()))
+    merged["decode_avg_us"] = round(decode_us / count, 2) if count else 0.0
+    return merged
+
+
+def log_stats(stats: dict):
+    logger.info(
+        "%d workers, %d sessions, %.1f packets/s, %d skipped, %d malformed, %d sampled out, %s kernel drops, "
+        "decode avg %.2f us max %.2f us",
+        stats["workers"], len(stats["sessions"]), stats["packets_per_second"], stats["skipped"],
+        stats["malformed"], stats["sampled"], stats["kernel_drops"], stats["decode_avg_us"], stats["decode_max_us"])
+
+
+class Ingest(object):
+    """Receives in several worker processes, each with its own ``Receiver``
+
+    With one port all workers bind it with ``SO_REUSEPORT`` and the kernel
+    routes every source address, and so every game session, to always the
+    same worker. With several ports each worker binds one of them, e.g. one
+    port per player. Workers report their stats, including packets per
+    ``session_uid``, to the parent, which merges them per interval.
+
+    Args:
+        packets_path (str):
+            - Path of the generated ``packets.py``, loaded in every worker
+        ports (list):
+            - One port shared by ``workers`` processes, or one port per worker
+        workers (int):
+            - Number of processes sharing a single port, ignored for several ports
+        host (str):
+            - Address to bind
+        rcvbuf (int):
+            - Requested ``SO_RCVBUF`` of every worker's socket
+        stats_interval (float):
+            - Seconds between two calls of ``on_stats``
+        on_stats (callable):
+            - Called in the parent with the merged stats ``dict``
+        packet_ids (iterable):
+            - Packet ids or class names to decode
+        handler_factory (callable):
+            - Called in every worker with its index, returns the
+              ``handler(packet, address)`` of that worker; has to be picklable,
+              e.g. a module level function
+        batch_size (int):
+            - Datagrams per receive syscall, see ``Receiver``
+        sample (dict):
+            - Rules of a ``udp.sampling.Sampler`` per packet id or class name,
+              every worker samples its own datagrams
+
+    """
+
+    def __init__(self, packets_path: str, ports: list, workers: int = None, host: str = DEFAULT_HOST,
+                 rcvbuf: int = DEFAULT_RCVBUF, stats_interval: float = 1.0, on_stats=log_stats, packet_ids=None,
+                 handler_factory=None, batch_size: int = 1, sample: dict = None):
+        if len(ports) > 1:
+            workers = len(ports)
+        elif workers is None:
+            workers = multiprocessing.cpu_count()
+        self.stats_interval = stats_interval
+        self.on_stats = on_stats
+
+        self._stats_queue = multiprocessing.Queue()
+        self._stop_event = multiprocessing.Event()
+        self._processes = []
+        for index in range(workers):
+            port = ports[index] if len(ports) > 1 else ports[0]
+            process = multiprocessing.Process(
+                target=_worker, name=f"ingest-{index}", daemon=True,
+                args=(index, packets_path, host, port, rcvbuf, len(ports) == 1, stats_interval,
+                      packet_ids, handler_factory, batch_size, sample, self._stats_queue, self._stop_event))
+            self._processes.append(process)
+
+    def run(self):
+        """Starts the workers and merges their stats until ``stop`` is called or all workers exited"""
+        for process in self._processes:
+            process.start()
+        started = time.monotonic()
+        next_report = started + self.stats_interval
+        reports = []
+        while not self._stop_event.is_set() and any(process.is_alive() for process in self._processes):
+            try:
+                reports.append(self._stats_queue.get(timeout=max(next_report - time.monotonic(), 0)))
+            except queue.Empty:
+                pass
+            now = time.monotonic()
+            if now >= next_report:
+                if self.on_stats is not None and reports:
+                    self.on_stats(merge_stats(reports, now - started))
+                reports = []
+                started = now
+                next_report = now + self.stats_interval
+
+    def stop(self):
+        self._stop_event.set()
+
+    def close(self, timeout: float = None):
+        """Stops the workers, waits for them to finish their interval and terminates the rest"""
+        self.stop()
+        if timeout is None:
+            timeout = 2 * self.stats_interval
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            if process.pid is None:
+                continue
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._stats_queue.close()
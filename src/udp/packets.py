@@ -0,0 +1,27 @@
+import importlib.util
+import os
+
+DEFAULT_PATH = os.path.join("data", "F124", "packets.py")
+DEFAULT_DTYPES_PATH = os.path.join("data", "F124", "dtypes.py")
+
+_modules = {}
+
+
+def load(path: str = DEFAULT_PATH):
+    """Imports a generated ``packets.py`` (or ``dtypes.py``) and returns the module
+
+    Modules are cached by their real path so every caller shares the same
+    ``Packet`` classes.
+    """
+    real_path = os.path.realpath(path)
+    module = _modules.get(real_path)
+    if module is not None:
+        return module
+
+    file_name = os.path.splitext(os.path.basename(real_path))[0]
+    module_name = file_name + "_" + os.path.basename(os.path.dirname(real_path))
+    spec = importlib.util.spec_from_file_location(module_name, real_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    _modules[real_path] = module
+    return module
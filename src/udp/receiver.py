@@ -0,0 +1,304 @@
+import logging
+import os
+import socket
+import time
+
+from udp.buffers import BufferPoolExhausted, MAX_DATAGRAM_SIZE
+from udp.dispatch import Dispatcher
+from udp.mmsg import ReceiveBatch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "0.0.0.0"
+DEFAULT_PORT = 20777
+DEFAULT_RCVBUF = 8 * 1024 * 1024
+
+_PROC_NET_UDP = ("/proc/net/udp", "/proc/net/udp6")
+
+
+def create_socket(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, rcvbuf: int = DEFAULT_RCVBUF,
+                  reuse_port: bool = False) -> socket.socket:
+    """Returns a bound UDP socket with a receive buffer of at least ``rcvbuf`` bytes if the OS allows it
+
+    With ``reuse_port`` several sockets, e.g. of worker processes, can bind
+    the same port and the kernel spreads the datagrams over them by source
+    address.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_DGRAM)
+    if reuse_port:
+        if not hasattr(socket, "SO_REUSEPORT"):
+            sock.close()
+            raise OSError("SO_REUSEPORT is not supported on this platform")
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    sock.bind((host, port))
+
+    actual = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+    if actual < rcvbuf:
+        logger.warning(
+            "SO_RCVBUF is %d bytes, requested %d (raise net.core.rmem_max)", actual, rcvbuf)
+    return sock
+
+
+def kernel_drops(sock: socket.socket):
+    """Returns the number of datagrams the kernel dropped for ``sock``, ``None`` if unknown
+
+    Only available on Linux, where the counter is the last column of
+    ``/proc/net/udp`` for the socket's inode.
+    """
+    inode = str(os.fstat(sock.fileno()).st_ino)
+    for path in _PROC_NET_UDP:
+        try:
+            with open(path) as f:
+                lines = f.readlines()[1:]
+        except OSError:
+            continue
+        for line in lines:
+            columns = line.split()
+            if len(columns) > 12 and columns[9] == inode:
+                return int(columns[12])
+    return None
+
+
+class ReceiverStats(object):
+    """Counters of one reporting interval"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.packets = {}
+        self.skipped = 0
+        self.malformed = 0
+        self.sampled = 0
+        self.pool_exhausted = 0
+        self.decode_ns = 0
+        self.decode_max_ns = 0
+
+    def count(self):
+        return sum(self.packets.values())
+
+    def to_dict(self, elapsed: float, kernel_drops=None):
+        count = self.count()
+        return {
+            "packets_per_second": round(count / elapsed, 1) if elapsed > 0 else 0.0,
+            "packets": dict(sorted(self.packets.items())),
+            "skipped": self.skipped,
+            "malformed": self.malformed,
+            "sampled": self.sampled,
+            "pool_exhausted": self.pool_exhausted,
+            "kernel_drops": kernel_drops,
+            "decode_avg_us": round(self.decode_ns / count / 1000, 2) if count else 0.0,
+            "decode_max_us": round(self.decode_max_ns / 1000, 2),
+        }
+
+
+def log_stats(stats: dict):
+    logger.info(
+        "%.1f packets/s, %d skipped, %d malformed, %d sampled out, %s kernel drops, decode avg %.2f us max %.2f us",
+        stats["packets_per_second"], stats["skipped"], stats["malformed"], stats["sampled"],
+        stats["kernel_drops"], stats["decode_avg_us"], stats["decode_max_us"])
+
+
+class Receiver(object):
+    """Receives F1 UDP datagrams and dispatches them to the generated packet classes
+
+    Args:
+        packets (module):
+            - A generated ``packets.py`` module, see ``udp.packets.load``
+        sock (socket.socket):
+            - A bound socket, created with ``create_socket`` if omitted
+        stats_interval (float):
+            - Seconds between two calls of ``on_stats``
+        on_stats (callable):
+            - Called with the interval's stats ``dict``, logs them by default
+        pool (udp.buffers.BufferPool):
+            - If given, packets are zero-copy views into buffers of the pool
+              and handlers have to ``release`` them once they are done
+        packet_ids (iterable):
+            - Packet ids or class names to decode, the others are skipped
+              before any ``Packet`` is created
+        batch_size (int):
+            - If greater than ``1``, ``run`` receives up to this many datagrams
+              per syscall with ``udp.mmsg.ReceiveBatch`` and packets are
+              zero-copy views into its slab, valid until the handler returns;
+              cannot be combined with ``pool``
+        metrics (udp.metrics.Metrics):
+            - Observes every datagram and every decode if given
+        sampler (udp.sampling.Sampler):
+            - Decides per datagram whether it is decoded, after the raw
+              handlers and before any ``Packet`` is created
+
+    """
+
+    def __init__(self, packets, sock=None, stats_interval: float = 1.0, on_stats=log_stats, pool=None,
+                 packet_ids=None, batch_size: int = 1, metrics=None, sampler=None):
+        if pool is not None and batch_size > 1:
+            raise ValueError("pool and batch_size cannot be combined")
+        self.dispatcher = Dispatcher(packets.HEADER_FIELD_TO_PACKET_TYPE, packet_ids)
+        self.sock = sock if sock is not None else create_socket()
+        self.stats_interval = stats_interval
+        self.on_stats = on_stats
+        self.pool = pool
+        self.batch = ReceiveBatch(batch_size) if batch_size > 1 else None
+        self.metrics = metrics
+        self.sampler = sampler
+
+        self._buffer = bytearray(MAX_DATAGRAM_SIZE)
+        self._view = memoryview(self._buffer)
+        self._header_size = packets.PacketHeader.size()
+        self._handlers = []
+        self._raw_handlers = [metrics.observe] if metrics is not None else []
+        self._running = False
+        self._stats = ReceiverStats()
+        self._kernel_drops = kernel_drops(self.sock)
+
+    def add_handler(self, handler):
+        """Registers ``handler(packet, address)``, called for every decoded packet"""
+        self._handlers.append(handler)
+
+    def add_raw_handler(self, handler):
+        """Registers ``handler(datagram, address)``, called with every datagram before it is decoded
+
+        ``datagram`` is a ``memoryview`` of the receive buffer, valid until the handler returns.
+        """
+        self._raw_handlers.append(handler)
+
+    def receive(self):
+        """Blocks for one datagram and returns ``(packet, address)``
+
+        ``packet`` is ``None`` if the datagram is not a known packet or
+        no buffer of the pool was free.
+        """
+        pool = self.pool
+        if pool is None:
+            n, address = self.sock.recvfrom_into(self._buffer)
+            self._call_raw_handlers(self._view, n, address)
+            return self.decode(self._view, n), address
+
+        try:
+            index = pool.acquire()
+        except BufferPoolExhausted:
+            n, address = self.sock.recvfrom_into(self._buffer)
+            self._stats.pool_exhausted += 1
+            self._call_raw_handlers(self._view, n, address)
+            return None, address
+        buffer = pool.buffer(index)
+        try:
+            n, address = self.sock.recvfrom_into(buffer)
+        except BaseException:
+            pool.release(index)
+            raise
+        self._call_raw_handlers(buffer, n, address)
+        packet = self.decode(buffer, n, copy=False)
+        if packet is None:
+            pool.release(index)
+        return packet, address
+
+    def receive_batch(self) -> list:
+        """Blocks for datagrams and returns ``(packet, address)`` of every one of them
+
+        Needs ``batch_size``. ``packet`` is ``None`` if the datagram is not a
+        known packet, otherwise a view into the batch, valid until the next call.
+        Datagrams cut off by the batch's slot size count as malformed and are
+        not passed to the raw handlers.
+        """
+        batch = self.batch
+        n = batch.receive(self.sock)
+        received = []
+        for i, datagram in enumerate(batch.datagrams(n)):
+            address = batch.address(i)
+            if batch.truncated(i):
+                self._stats.malformed += 1
+                received.append((None, address))
+                continue
+            size = len(datagram)
+            self._call_raw_handlers(datagram, size, address)
+            received.append((self.decode(datagram, size, copy=False), address))
+        return received
+
+    def _call_raw_handlers(self, buffer, n: int, address):
+        if self._raw_handlers:
+            datagram = buffer[:n]
+            for handler in self._raw_handlers:
+                handler(datagram, address)
+
+    def decode(self, buffer, n: int, copy: bool = True):
+        """Decodes the first ``n`` bytes of ``buffer``
+
+        Args:
+            buffer (memoryview):
+                - The receive buffer
+            n (int):
+                - Number of bytes received
+            copy (bool):
+                - Passed on to ``Packet.unpack``
+
+        """
+        started = time.perf_counter_ns()
+        stats = self._stats
+        if n < self._header_size:
+            stats.malformed += 1
+            return None
+
+        packet_type = self.dispatcher.get(buffer)
+        if packet_type is None:
+            stats.skipped += 1
+            return None
+        if self.sampler is not None and not self.sampler.accept(buffer, n):
+            stats.sampled += 1
+            return None
+        if n < packet_type.size():
+            stats.malformed += 1
+            return None
+        packet = packet_type.unpack(buffer[:n], copy)
+
+        elapsed = time.perf_counter_ns() - started
+        if self.metrics is not None:
+            self.metrics.observe_decode(packet_type, elapsed / 1e9)
+        stats.decode_ns += elapsed
+        if elapsed > stats.decode_max_ns:
+            stats.decode_max_ns = elapsed
+        name = packet_type.__name__
+        stats.packets[name] = stats.packets.get(name, 0) + 1
+        return packet
+
+    def run(self):
+        """Receives until ``stop`` is called"""
+        self._running = True
+        self.sock.settimeout(self.stats_interval)
+        next_report = time.monotonic() + self.stats_interval
+        handlers = self._handlers
+        while self._running:
+            try:
+                if self.batch is None:
+                    received = (self.receive(),)
+                else:
+                    received = self.receive_batch()
+            except socket.timeout:
+                received = ()
+            for packet, address in received:
+                if packet is not None:
+                    for handler in handlers:
+                        handler(packet, address)
+            now = time.monotonic()
+            if now >= next_report:
+                self.report()
+                next_report = now + self.stats_interval
+
+    def stop(self):
+        self._running = False
+
+    def report(self):
+        """Passes the stats of the elapsed interval to ``on_stats`` and resets them"""
+        stats = self._stats
+        self._stats = ReceiverStats()
+        drops = kernel_drops(self.sock)
+        drops_delta = None
+        if drops is not None and self._kernel_drops is not None:
+            drops_delta = drops - self._kernel_drops
+        self._kernel_drops = drops
+        if self.on_stats is not None:
+            self.on_stats(stats.to_dict(time.monotonic() - stats.started, drops_delta))
+
+    def close(self):
+        self.sock.close()
@@ -0,0 +1,310 @@
+import bisect
+import mmap
+import os
+import struct
+import time
+
+from udp.dispatch import HEADER_DISPATCH, HEADER_INDEX_FIELDS, Dispatcher
+
+MAGIC = b"F1UDPREC"
+VERSION = 1
+INDEX_SUFFIX = ".idx"
+SORTED_INDEX_SUFFIX = ".sidx"
+
+# magic, format version
+FILE_HEADER = struct.Struct("<8sH")
+# receive time (seconds since the epoch), datagram length
+RECORD_HEADER = struct.Struct("<dH")
+# session_uid, overall_frame_identifier, packet_id, offset of the record in the data file
+INDEX_ENTRY = struct.Struct("<QIBQ")
+
+
+class RecordingError(Exception):
+    pass
+
+
+def read_file_header(f):
+    """Checks the file header of an open recording and returns its format version"""
+    data = f.read(FILE_HEADER.size)
+    if len(data) < FILE_HEADER.size:
+        raise RecordingError("file is too short to be a recording")
+    magic, version = FILE_HEADER.unpack(data)
+    if magic != MAGIC:
+        raise RecordingError("file is not a recording")
+    if version != VERSION:
+        raise RecordingError(f"unsupported recording version {version}")
+    return version
+
+
+def read_record(f, offset: int):
+    """Returns ``(timestamp, datagram)`` of the record at ``offset`` of an open recording"""
+    f.seek(offset)
+    timestamp, n = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+    return timestamp, f.read(n)
+
+
+class Recorder(object):
+    """Appends raw datagrams to a recording and its index
+
+    Every record is a ``RECORD_HEADER`` followed by the datagram. For each
+    datagram with a complete ``PacketHeader`` an ``INDEX_ENTRY`` is appended
+    to the sidecar file ``path + INDEX_SUFFIX``, in arrival order. ``close``
+    writes the entries sorted to ``path + SORTED_INDEX_SUFFIX``, which
+    ``RecordingIndex`` searches without loading it. Existing recordings are
+    continued.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._offset = os.path.getsize(path) if os.path.exists(path) else 0
+        if self._offset:
+            with open(path, "rb") as f:
+                read_file_header(f)
+        self._data = open(path, "ab")
+        self._index = open(path + INDEX_SUFFIX, "ab")
+        if not self._offset:
+            self._data.write(FILE_HEADER.pack(MAGIC, VERSION))
+            self._offset = FILE_HEADER.size
+
+    def write(self, datagram, timestamp: float = None):
+        """Appends ``datagram``, received at ``timestamp`` (now if omitted)"""
+        if timestamp is None:
+            timestamp = time.time()
+        n = len(datagram)
+        self._data.write(RECORD_HEADER.pack(timestamp, n))
+        self._data.write(datagram)
+        if n >= HEADER_INDEX_FIELDS.size:
+            packet_id, session_uid, frame = HEADER_INDEX_FIELDS.unpack_from(datagram)
+            self._index.write(INDEX_ENTRY.pack(session_uid, frame, packet_id, self._offset))
+        self._offset += RECORD_HEADER.size + n
+
+    def flush(self):
+        self._data.flush()
+        self._index.flush()
+
+    def close(self):
+        self._data.close()
+        self._index.close()
+        sort_index(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _read_sorted_entries(index_path: str) -> bytes:
+    with open(index_path, "rb") as f:
+        data = f.read()
+    data = data[:len(data) - len(data) % INDEX_ENTRY.size]
+    return b"".join(INDEX_ENTRY.pack(*entry) for entry in sorted(INDEX_ENTRY.iter_unpack(data)))
+
+
+def sort_index(path: str):
+    """Writes the sorted index of the recording at ``path``, e.g. of one whose recorder was not closed"""
+    index_path = path + INDEX_SUFFIX
+    if not os.path.exists(index_path):
+        return
+    sorted_path = path + SORTED_INDEX_SUFFIX
+    temporary = sorted_path + ".tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(_read_sorted_entries(index_path))
+        os.replace(temporary, sorted_path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.unlink(temporary)
+        raise
+
+
+class _Entries(object):
+    """Sequence of the ``INDEX_ENTRY`` tuples packed in ``data``, unpacked on access"""
+
+    def __init__(self, data):
+        self._data = data
+        self._count = len(data) // INDEX_ENTRY.size
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i: int) -> tuple:
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return INDEX_ENTRY.unpack_from(self._data, i * INDEX_ENTRY.size)
+
+
+class RecordingIndex(object):
+    """The sorted index of a recording
+
+    Entries are ``(session_uid, overall_frame_identifier, packet_id, offset)``
+    tuples, sorted so a frame is found with a binary search. The sorted index
+    written by ``Recorder.close`` is memory mapped and only the entries the
+    search visits are unpacked. Without an up to date sorted index, e.g.
+    while the recording is still being written, the index is sorted in memory.
+    """
+
+    def __init__(self, path: str):
+        self._map = None
+        index_size = os.path.getsize(path + INDEX_SUFFIX)
+        index_size -= index_size % INDEX_ENTRY.size
+        sorted_path = path + SORTED_INDEX_SUFFIX
+        if index_size and os.path.exists(sorted_path) and os.path.getsize(sorted_path) == index_size:
+            with open(sorted_path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.entries = _Entries(self._map)
+        else:
+            self.entries = _Entries(_read_sorted_entries(path + INDEX_SUFFIX))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def session_uids(self) -> list:
+        """Returns the session uids of the recording in ascending order"""
+        uids = []
+        i = 0
+        while i < len(self.entries):
+            session_uid = self.entries[i][0]
+            uids.append(session_uid)
+            i = bisect.bisect_left(self.entries, (session_uid + 1,), i)
+        return uids
+
+    def seek(self, session_uid: int, overall_frame_identifier: int = 0) -> int:
+        """Returns the offset of the first record of a session at or after the given frame
+
+        Raises:
+            KeyError: if the session has no such frame
+
+        """
+        i = bisect.bisect_left(self.entries, (session_uid, overall_frame_identifier))
+        if i == len(self.entries) or self.entries[i][0] != session_uid:
+            raise KeyError((session_uid, overall_frame_identifier))
+        offsets = [entry[3] for entry in self._frame_entries(i)]
+        return min(offsets)
+
+    def find(self, session_uid: int, overall_frame_identifier: int) -> dict:
+        """Returns ``{packet_id: offset}`` of every record of one frame"""
+        i = bisect.bisect_left(self.entries, (session_uid, overall_frame_identifier))
+        return {
+            entry[2]: entry[3] for entry in self._frame_entries(i)
+            if entry[:2] == (session_uid, overall_frame_identifier)
+        }
+
+    def _frame_entries(self, i: int):
+        entries = self.entries
+        key = entries[i][:2] if i < len(entries) else None
+        while i < len(entries) and entries[i][:2] == key:
+            yield entries[i]
+            i += 1
+
+    def close(self):
+        if self._map is not None:
+            self.entries = _Entries(b"")
+            self._map.close()
+            self._map = None
+
+
+class RecordingReader(object):
+    """Reads a recording through a memory map
+
+    The file is mapped copy-on-write, so records and packets are views into
+    the mapping: nothing is read up front or copied per record, and other
+    processes reading the same recording share its pages in the page cache.
+    Packets stay valid until ``close``, which requires that no packet of the
+    reader is referenced anymore. Iterating yields ``packets``, or ``records``
+    if the reader has no ``packets`` module.
+
+    Args:
+        path (str):
+            - Path of the recording
+        packets (module):
+            - The generated ``packets.py`` to decode with, only needed for ``packets`` and ``seek``
+        packet_ids (iterable):
+            - Packet ids or class names to decode, all if omitted
+
+    """
+
+    def __init__(self, path: str, packets=None, packet_ids=None):
+        self.path = path
+        self.dispatcher = None
+        if packets is not None:
+            self.dispatcher = Dispatcher(packets.HEADER_FIELD_TO_PACKET_TYPE, packet_ids)
+        self._index = None
+        with open(path, "rb") as f:
+            read_file_header(f)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        self._view = memoryview(self._map)
+
+    @property
+    def index(self) -> RecordingIndex:
+        if self._index is None:
+            self._index = RecordingIndex(self.path)
+        return self._index
+
+    def records(self, offset: int = FILE_HEADER.size):
+        """Yields ``(offset, timestamp, datagram)`` of every record from ``offset`` on
+
+        ``datagram`` is a ``memoryview`` of the mapping. A record cut off at
+        the end of the file, e.g. by a recorder that is still writing, ends
+        the iteration.
+        """
+        view = self._view
+        end = len(view)
+        while offset + RECORD_HEADER.size <= end:
+            timestamp, n = RECORD_HEADER.unpack_from(view, offset)
+            start = offset + RECORD_HEADER.size
+            if start + n > end:
+                break
+            yield offset, timestamp, view[start:start + n]
+            offset = start + n
+
+    def _check_packets(self):
+        if self.dispatcher is None:
+            raise ValueError(f"cannot decode packets of {self.path}: the RecordingReader has no packets module")
+
+    def packets(self, offset: int = FILE_HEADER.size):
+        """Returns an iterator of ``(timestamp, packet)`` of every known packet from ``offset`` on
+
+        Raises:
+            ValueError: if the reader has no ``packets`` module
+
+        """
+        self._check_packets()
+        return self._packets(offset)
+
+    def _packets(self, offset: int):
+        get_packet_type = self.dispatcher.get
+        for _, timestamp, datagram in self.records(offset):
+            if len(datagram) < HEADER_DISPATCH.size:
+                continue
+            packet_type = get_packet_type(datagram)
+            if packet_type is None or len(datagram) < packet_type.size():
+                continue
+            yield timestamp, packet_type.unpack(datagram, copy=False)
+
+    def seek(self, session_uid: int, overall_frame_identifier: int = 0):
+        """Returns an iterator of ``(timestamp, packet)`` starting at a frame of a session, see ``RecordingIndex.seek``
+
+        Raises:
+            ValueError: if the reader has no ``packets`` module
+
+        """
+        self._check_packets()
+        return self._packets(self.index.seek(session_uid, overall_frame_identifier))
+
+    def __iter__(self):
+        if self.dispatcher is None:
+            return self.records()
+        return self.packets()
+
+    def close(self):
+        if self._index is not None:
+            self._index.close()
+        self._view.release()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
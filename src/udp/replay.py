@@ -0,0 +1,87 @@
+import logging
+import socket
+import time
+
+from udp.mmsg import MessageBatch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_SNDBUF = 8 * 1024 * 1024
+
+
+def create_socket(target: tuple, sndbuf: int = DEFAULT_SNDBUF) -> socket.socket:
+    """Returns a UDP socket connected to ``(host, port)``"""
+    family = socket.AF_INET6 if ":" in target[0] else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, sndbuf)
+    sock.connect(target)
+    return sock
+
+
+def log_stats(stats: dict):
+    logger.info("sent %d packets, %.1f packets/s", stats["packets"], stats["packets_per_second"])
+
+
+def replay(records, sock, speed: float = 1.0, batch_size: int = DEFAULT_BATCH_SIZE,
+           stats_interval: float = 1.0, on_stats=log_stats) -> dict:
+    """Sends recorded datagrams to a connected socket
+
+    Args:
+        records (iterable):
+            - ``(offset, timestamp, datagram)`` tuples, e.g. ``RecordingReader.records()``
+        sock (socket.socket):
+            - A UDP socket connected to the target, see ``create_socket``
+        speed (float):
+            - ``1`` keeps the recorded cadence, ``N`` replays ``N`` times
+              faster and ``0`` sends as fast as possible
+        batch_size (int):
+            - Maximum number of datagrams per send syscall
+        stats_interval (float):
+            - Seconds between two calls of ``on_stats``
+        on_stats (callable):
+            - Called with the stats ``dict`` of every interval
+
+    Returns:
+        (dict):
+            - Packets sent and packets/s achieved over the whole replay
+
+    """
+    batch = MessageBatch(batch_size)
+    pending = []
+    total = 0
+    interval_count = 0
+    started = time.monotonic()
+    interval_started = started
+    first_timestamp = None
+
+    for _, timestamp, datagram in records:
+        if speed > 0:
+            if first_timestamp is None:
+                first_timestamp = timestamp
+            delay = started + (timestamp - first_timestamp) / speed - time.monotonic()
+            if delay > 0:
+                if pending:
+                    total += batch.send(sock, pending)
+                    interval_count += len(pending)
+                    pending.clear()
+                time.sleep(delay)
+
+        pending.append(datagram)
+        if len(pending) == batch_size:
+            total += batch.send(sock, pending)
+            interval_count += len(pending)
+            pending.clear()
+
+        now = time.monotonic()
+        if now - interval_started >= stats_interval:
+            if on_stats is not None:
+                on_stats({"packets": interval_count, "packets_per_second": interval_count / (now - interval_started)})
+            interval_count = 0
+            interval_started = now
+
+    if pending:
+        total += batch.send(sock, pending)
+
+    elapsed = time.monotonic() - started
+    return {"packets": total, "packets_per_second": total / elapsed if elapsed > 0 else 0.0}
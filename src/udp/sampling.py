@@ -0,0 +1,134 @@
+import time
+import zlib
+
+from udp.dispatch import HEADER_STREAM, PACKET_HEADER
+
+
+class EveryNth(object):
+    """Keeps the first and then every ``n``-th datagram"""
+
+    def __init__(self, n: int):
+        if n < 1:
+            raise ValueError("n has to be at least 1")
+        self.n = n
+        self._counts = {}
+
+    def accept(self, key, datagram, n: int) -> bool:
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        return count % self.n == 0
+
+
+class Interval(object):
+    """Keeps at most one datagram per ``seconds``, on average exactly one if datagrams arrive more often"""
+
+    def __init__(self, seconds: float, clock=time.monotonic):
+        if not 0 < seconds < float("inf"):
+            raise ValueError("seconds has to be a positive number")
+        self.seconds = seconds
+        self.clock = clock
+        self._due = {}
+
+    def accept(self, key, datagram, n: int) -> bool:
+        now = self.clock()
+        due = self._due.get(key)
+        if due is not None and now < due:
+            return False
+        # keep the cadence unless the stream paused for longer than an interval
+        self._due[key] = due + self.seconds if due is not None and now - due < self.seconds else now + self.seconds
+        return True
+
+
+class OnChange(object):
+    """Keeps a datagram only if its payload after the header differs from the previous one
+
+    Compares the CRC-32 of the payload, so a rare collision drops a change.
+    """
+
+    def __init__(self, header_size: int = PACKET_HEADER.size):
+        self.header_size = header_size
+        self._hashes = {}
+
+    def accept(self, key, datagram, n: int) -> bool:
+        checksum = zlib.crc32(datagram[self.header_size:n])
+        if self._hashes.get(key) == checksum:
+            return False
+        self._hashes[key] = checksum
+        return True
+
+
+class Drop(object):
+    """Keeps no datagram"""
+
+    def accept(self, key, datagram, n: int) -> bool:
+        return False
+
+
+def parse_rule(value: str):
+    """Returns the rule of ``value``: ``every:N``, ``hz:RATE``, ``interval:SECONDS``, ``on-change`` or ``drop``
+
+    Raises:
+        ValueError: if ``value`` is no rule or its argument is out of range
+
+    """
+    kind, _, argument = value.partition(":")
+    try:
+        if kind == "every":
+            return EveryNth(int(argument))
+        if kind == "hz":
+            rate = float(argument)
+            if not 0 < rate < float("inf"):
+                raise ValueError("the rate has to be a positive number")
+            return Interval(1 / rate)
+        if kind == "interval":
+            return Interval(float(argument))
+        if kind in ("on-change", "drop") and argument:
+            raise ValueError(f"{kind} takes no argument")
+        if kind == "on-change":
+            return OnChange()
+        if kind == "drop":
+            return Drop()
+    except ValueError as e:
+        raise ValueError(f"invalid sampling rule {value!r}: {e}") from None
+    raise ValueError(f"invalid sampling rule {value!r}: unknown rule")
+
+
+class Sampler(object):
+    """Decides per raw datagram whether it is decoded at all
+
+    Every rule keeps its state per ``session_uid`` and ``packet_id``, so
+    sessions do not influence each other. Datagrams of packet ids without a
+    rule are kept.
+
+    Args:
+        rules (dict):
+            - Rule, like ``EveryNth(6)`` or ``OnChange()``, per packet id or
+              packet class name
+        packets (module):
+            - A generated ``packets.py`` module, needed for class names
+
+    """
+
+    def __init__(self, rules: dict, packets=None):
+        names = {}
+        if packets is not None:
+            names = {name: packet_id for packet_id, name in packets.PACKET_ID_TO_PACKET_TYPE_STR.items()}
+        self._rules = [None] * 256
+        for packet_id, rule in rules.items():
+            if isinstance(packet_id, str):
+                if packet_id not in names:
+                    raise ValueError(f"unknown packet {packet_id!r}")
+                packet_id = names[packet_id]
+            self._rules[packet_id] = rule
+        self.dropped = 0
+
+    def accept(self, datagram, n: int = None) -> bool:
+        """Returns whether the first ``n`` bytes of ``datagram``, all if omitted, are to be decoded"""
+        packet_id, session_uid = HEADER_STREAM.unpack_from(datagram)
+        rule = self._rules[packet_id]
+        if rule is None:
+            return True
+        if rule.accept((session_uid, packet_id), datagram, len(datagram) if n is None else n):
+            return True
+        self.dropped += 1
+        return False
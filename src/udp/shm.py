@@ -0,0 +1,241 @@
+import inspect
+import struct
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+from udp.buffers import MAX_DATAGRAM_SIZE
+from udp.dispatch import Dispatcher
+
+MAGIC = b"F1UDPSHM"
+VERSION = 1
+
+# magic, version, slot count, slot size, next sequence number to be written
+RING_HEADER = struct.Struct("<8sHII")
+WRITE_SEQUENCE = struct.Struct("<Q")
+WRITE_SEQUENCE_OFFSET = 24
+DATA_OFFSET = 64
+# stamp, length; the stamp is 2 * sequence + 1 while the slot is written and 2 * sequence + 2 once it is complete
+SLOT_HEADER = struct.Struct("<QI4x")
+
+DEFAULT_SLOTS = 4096
+
+# SharedMemory(track=False), Python 3.13 and later
+_HAVE_TRACK = "track" in inspect.signature(shared_memory.SharedMemory).parameters
+_register_lock = threading.Lock()
+
+
+class RingOverrun(Exception):
+    """Raised by ``RingReader.read`` if the writer overwrote datagrams before they were read"""
+
+
+class RingWriter(object):
+    """Single writer of a ring buffer of raw datagrams in shared memory
+
+    Every datagram gets the next sequence number and overwrites the oldest
+    slot; the writer never waits for readers.
+
+    Args:
+        name (str):
+            - Name of the shared memory block, random if omitted
+        slots (int):
+            - Number of datagrams the ring holds
+        slot_size (int):
+            - Maximum size of a datagram
+
+    """
+
+    def __init__(self, name: str = None, slots: int = DEFAULT_SLOTS, slot_size: int = MAX_DATAGRAM_SIZE):
+        self.slots = slots
+        self.stride = SLOT_HEADER.size + slot_size
+        self.slot_size = slot_size
+        self.shm = shared_memory.SharedMemory(name, create=True, size=DATA_OFFSET + slots * self.stride)
+        self.name = self.shm.name
+        self._buf = self.shm.buf
+        self._sequence = 0
+        RING_HEADER.pack_into(self._buf, 0, MAGIC, VERSION, slots, slot_size)
+        WRITE_SEQUENCE.pack_into(self._buf, WRITE_SEQUENCE_OFFSET, 0)
+
+    def write(self, datagram):
+        """Appends ``datagram`` and returns its sequence number"""
+        n = len(datagram)
+        if n > self.slot_size:
+            raise ValueError(f"datagram of {n} bytes does not fit slots of {self.slot_size} bytes")
+        buf = self._buf
+        sequence = self._sequence
+        offset = DATA_OFFSET + (sequence % self.slots) * self.stride
+        SLOT_HEADER.pack_into(buf, offset, 2 * sequence + 1, 0)
+        start = offset + SLOT_HEADER.size
+        buf[start:start + n] = datagram
+        SLOT_HEADER.pack_into(buf, offset, 2 * sequence + 2, n)
+        self._sequence = sequence + 1
+        WRITE_SEQUENCE.pack_into(buf, WRITE_SEQUENCE_OFFSET, sequence + 1)
+        return sequence
+
+    def close(self):
+        """Detaches from and removes the shared memory, readers keep their mapping until they close"""
+        self._buf = None
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attaches to the block ``name`` without registering it with the resource tracker"""
+    if _HAVE_TRACK:
+        return shared_memory.SharedMemory(name, track=False)
+    # before Python 3.13 attaching registers the block with the resource tracker, which removes it once the
+    # reader exits; unregistering afterwards would also drop the writer's registration if they share a tracker.
+    # So the registration of this block is skipped while attaching, other registrations pass through.
+    with _register_lock:
+        register = resource_tracker.register
+
+        def register_others(resource_name: str, rtype: str):
+            if rtype != "shared_memory" or resource_name.lstrip("/") != name.lstrip("/"):
+                register(resource_name, rtype)
+
+        resource_tracker.register = register_others
+        try:
+            return shared_memory.SharedMemory(name)
+        finally:
+            resource_tracker.register = register
+
+
+class RingReader(object):
+    """Reads the datagrams of a ``RingWriter`` as zero-copy ``Packet`` views
+
+    Any number of readers, in any process, can follow the same ring. A view
+    points into the slot of the ring: once the writer has gone ``slots``
+    datagrams further, the slot is reused and the view changes under the
+    reader. ``valid`` tells whether a view was still intact after it was used.
+    Views have to be released before ``close``.
+
+    Args:
+        name (str):
+            - Name of the shared memory block of the writer
+        packets (module):
+            - A generated ``packets.py`` module
+        packet_ids (iterable):
+            - Packet ids or class names to decode, the others are skipped
+        from_start (bool):
+            - Start with the oldest datagram still in the ring instead of the next one
+        sampler (udp.sampling.Sampler):
+            - Decides per datagram whether it is decoded, e.g. to follow the
+              ring at a lower rate than the other readers
+
+    """
+
+    def __init__(self, name: str, packets, packet_ids=None, from_start: bool = False, sampler=None):
+        self.shm = _attach(name)
+        self._buf = self.shm.buf
+        magic, version, self.slots, slot_size = RING_HEADER.unpack_from(self._buf)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{name} is not a ring buffer of version {VERSION}")
+        self.stride = SLOT_HEADER.size + slot_size
+        self.dispatcher = Dispatcher(packets.HEADER_FIELD_TO_PACKET_TYPE, packet_ids)
+        self.header_size = packets.PacketHeader.size()
+        self.sampler = sampler
+        self.lost = 0
+
+        self.sequence = self.write_sequence()
+        if from_start:
+            self.sequence = max(self.sequence - self.slots, 0)
+
+    def write_sequence(self) -> int:
+        """Returns the sequence number the writer will write next"""
+        return WRITE_SEQUENCE.unpack_from(self._buf, WRITE_SEQUENCE_OFFSET)[0]
+
+    def valid(self, sequence: int) -> bool:
+        """Returns whether the datagram ``sequence`` is still in its slot"""
+        offset = DATA_OFFSET + (sequence % self.slots) * self.stride
+        return SLOT_HEADER.unpack_from(self._buf, offset)[0] == 2 * sequence + 2
+
+    def read(self):
+        """Returns ``(sequence, datagram)`` of the next datagram, ``None`` if there is none yet
+
+        Raises:
+            RingOverrun: if the reader fell more than ``slots`` datagrams behind;
+                the reader continues with the oldest datagram still in the ring
+                and ``lost`` counts the skipped ones
+
+        """
+        sequence = self.sequence
+        if sequence >= self.write_sequence():
+            return None
+        offset = DATA_OFFSET + (sequence % self.slots) * self.stride
+        stamp, n = SLOT_HEADER.unpack_from(self._buf, offset)
+        if stamp != 2 * sequence + 2:
+            # keep one slot of margin, the writer may be writing the oldest one
+            resume = self.write_sequence() - self.slots + 1
+            self.lost += resume - sequence
+            self.sequence = resume
+            raise RingOverrun(f"lost {resume - sequence} datagrams")
+        self.sequence = sequence + 1
+        start = offset + SLOT_HEADER.size
+        return sequence, self._buf[start:start + n]
+
+    def poll(self) -> list:
+        """Returns ``(sequence, packet)`` of every datagram written since the last call, without waiting
+
+        The oldest views of a long list are the first to be overwritten,
+        ``packets`` hands them out one by one instead.
+        """
+        received = []
+        while True:
+            try:
+                item = self.read()
+            except RingOverrun:
+                continue
+            if item is None:
+                return received
+            packet = self.decode(item[1])
+            if packet is not None:
+                received.append((item[0], packet))
+
+    def decode(self, datagram):
+        """Returns a ``Packet`` view of ``datagram``, ``None`` if it is not a known packet"""
+        if len(datagram) < self.header_size:
+            return None
+        packet_type = self.dispatcher.get(datagram)
+        if packet_type is None or len(datagram) < packet_type.size():
+            return None
+        if self.sampler is not None and not self.sampler.accept(datagram):
+            return None
+        return packet_type.unpack(datagram, copy=False)
+
+    def packets(self, poll_interval: float = 0.001, timeout: float = None):
+        """Yields ``(sequence, packet)`` as they are written, sleeping ``poll_interval`` when there are none
+
+        Stops after ``timeout`` seconds without a new datagram, runs forever if omitted.
+        """
+        idle_since = time.monotonic()
+        while True:
+            try:
+                item = self.read()
+            except RingOverrun:
+                continue
+            if item is not None:
+                packet = self.decode(item[1])
+                if packet is not None:
+                    yield item[0], packet
+                idle_since = time.monotonic()
+            elif timeout is not None and time.monotonic() - idle_since >= timeout:
+                return
+            else:
+                time.sleep(poll_interval)
+
+    def close(self):
+        self._buf = None
+        self.shm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,189 @@
+import ctypes
+import threading
+
+from udp.dispatch import HEADER_SESSION_FRAME
+
+NUM_CARS = 22
+
+# The packets that carry the data of one car, selected by this field right after the header
+CAR_INDEX_FIELDS = ("car_idx", "carIdx")
+
+
+def _per_car_fields(packet_type) -> list:
+    """Returns the names of the fields of ``packet_type`` that hold one struct per car"""
+    return [
+        name for name, field_type in packet_type._fields_
+        if issubclass(field_type, ctypes.Array) and issubclass(field_type._type_, ctypes.Structure)
+        and field_type._length_ == NUM_CARS
+    ]
+
+
+class Car(object):
+    """Live view of the state of one car
+
+    Attributes are the per-car fields of the packets, e.g. ``lap_data`` or
+    ``car_telemetry_data`` for F1 24, and ``session_history_data`` or
+    ``tyre_sets_data`` for the packets sent per car. They are views into the
+    ``SessionState`` and always show its latest data, so they are looked up
+    once and then kept as plain attributes.
+    """
+
+    def __init__(self, state, index: int):
+        self._state = state
+        self._index = index
+
+    def __getattr__(self, name: str):
+        state = self.__dict__["_state"]
+        index = self.__dict__["_index"]
+        fields = state._per_car
+        if name in fields:
+            view = getattr(fields[name], name)[index]
+        elif name in state._car_packets:
+            view = state._car_packets[name][index]
+        else:
+            raise AttributeError(name)
+        self.__dict__[name] = view
+        return view
+
+    def __dir__(self):
+        return list(self._state._per_car) + list(self._state._car_packets)
+
+
+class SessionState(object):
+    """The latest data of every packet type of one session, updated in place
+
+    One instance of every packet class is preallocated and every received
+    packet is copied over the instance of its class as one block of bytes,
+    so views into the state, like ``car``, stay valid. Applying a packet
+    costs the same no matter how many of its fields changed: the game sends
+    every field each time, and one copy of at most a few kB is far cheaper
+    than finding the changed fields in Python.
+    Packets that carry the data of one car (session history, tyre sets) are
+    kept per car.
+
+    Args:
+        session_uid (int):
+            - The session's ``PacketHeader.session_uid``
+        packets (module):
+            - A generated ``packets.py`` module
+
+    """
+
+    def __init__(self, session_uid: int, packets):
+        self.session_uid = session_uid
+        self.frames = {}
+        self.updated = {}
+        self._lock = threading.Lock()
+        self._latest = {}
+        self._views = {}
+        self._per_car = {}
+        self._car_packets = {}
+        for packet_type in packets.HEADER_FIELD_TO_PACKET_TYPE.values():
+            if packet_type._fields_[1][0] in CAR_INDEX_FIELDS:
+                # PacketSessionHistoryData -> session_history_data
+                name = _snake_case(packet_type.__name__[len("Packet"):])
+                instances = [packet_type() for _ in range(NUM_CARS)]
+                self._latest[packet_type] = instances
+                self._views[packet_type] = [memoryview(instance).cast("B") for instance in instances]
+                self._car_packets[name] = instances
+                continue
+            instance = packet_type()
+            self._latest[packet_type] = instance
+            self._views[packet_type] = memoryview(instance).cast("B")
+            for name in _per_car_fields(packet_type):
+                self._per_car[name] = instance
+        self._cars = [Car(self, i) for i in range(NUM_CARS)]
+
+    def apply(self, packet, address=None):
+        """Copies ``packet`` into the state and records its frame for ``address``"""
+        self._apply(packet, address, HEADER_SESSION_FRAME.unpack_from(packet)[1])
+
+    def _apply(self, packet, address, frame: int):
+        packet_type = type(packet)
+        target = self._views.get(packet_type)
+        if target is None:
+            return
+        if isinstance(target, list):
+            car_index = getattr(packet, packet_type._fields_[1][0])
+            if car_index >= NUM_CARS:
+                return
+            target = target[car_index]
+        with self._lock:
+            target[:] = memoryview(packet).cast("B")
+            self.frames[address] = frame
+            self.updated[packet_type.__name__] = frame
+
+    def get(self, packet_type):
+        """Returns the live instance of ``packet_type``, a list with one per car for the per-car packets"""
+        return self._latest[packet_type]
+
+    def car(self, index: int) -> Car:
+        """Returns the live view of car ``index``"""
+        return self._cars[index]
+
+    def frame(self):
+        """Returns the latest ``frame_identifier`` of any source, ``None`` before the first packet"""
+        return max(self.frames.values(), default=None)
+
+    def snapshot(self) -> dict:
+        """Returns a copy of the state that does not change anymore
+
+        Keys are the packet class names, values copies of the latest packets
+        (lists of them for the per-car packets), plus ``frames`` with the
+        latest ``frame_identifier`` per source address.
+        """
+        with self._lock:
+            snapshot = {}
+            for packet_type, latest in self._latest.items():
+                if isinstance(latest, list):
+                    snapshot[packet_type.__name__] = [packet_type.from_buffer_copy(car) for car in latest]
+                else:
+                    snapshot[packet_type.__name__] = packet_type.from_buffer_copy(latest)
+            snapshot["frames"] = dict(self.frames)
+        return snapshot
+
+
+class SessionStore(object):
+    """``SessionState`` of every session, keyed by ``session_uid``
+
+    ``apply`` has the signature of a ``Receiver`` handler:
+
+        store = SessionStore(packets)
+        receiver.add_handler(store.apply)
+        ...
+        store.latest().car(0).lap_data.current_lap_num
+
+    Args:
+        packets (module):
+            - A generated ``packets.py`` module
+
+    """
+
+    def __init__(self, packets):
+        self.packets = packets
+        self.sessions = {}
+        self._latest = None
+
+    def apply(self, packet, address=None):
+        session_uid, frame = HEADER_SESSION_FRAME.unpack_from(packet)
+        state = self.sessions.get(session_uid)
+        if state is None:
+            state = self.sessions[session_uid] = SessionState(session_uid, self.packets)
+        state._apply(packet, address, frame)
+        self._latest = state
+
+    def get(self, session_uid: int) -> SessionState:
+        return self.sessions[session_uid]
+
+    def latest(self) -> SessionState:
+        """Returns the session of the last applied packet, ``None`` before the first packet"""
+        return self._latest
+
+    def remove(self, session_uid: int):
+        self.sessions.pop(session_uid, None)
+        if self._latest is not None and self._latest.session_uid == session_uid:
+            self._latest = None
+
+
+def _snake_case(name: str) -> str:
+    return "".join("_" + c.lower() if c.isupper() else c for c in name).lstrip("_")
@@ -0,0 +1,302 @@
+import logging
+import math
+import random
+import time
+
+from udp.dispatch import PACKET_HEADER
+from udp.mmsg import MessageBatch
+
+logger = logging.getLogger(__name__)
+
+NUM_CARS = 22
+GAME_VERSION = (1, 0)
+
+# Packets per second of the types that are not sent every frame, as documented by the spec
+PACKET_RATES = {
+    "PacketSessionData": 2,
+    "PacketParticipantsData": 0.2,
+    "PacketCarSetupData": 2,
+    "PacketLobbyInfoData": 2,
+    "PacketCarDamageData": 10,
+    "PacketSessionHistoryData": 20,
+    "PacketTyreSetsData": 20,
+    "PacketTimeTrialData": 1,
+}
+
+
+class SyntheticSession(object):
+    """Produces the datagrams of one simulated session, car positions and laps included
+
+    Cars drive around a circular track at slightly different paces, so lap
+    counters, positions, fuel and tyre wear evolve. Every packet type of the
+    ``packets`` module is produced, either every frame or at ``PACKET_RATES``.
+    Events are sent for the session start, every new fastest lap and the
+    chequered flag, which also triggers the final classification.
+
+    Args:
+        packets (module):
+            - The generated ``packets.py`` whose classes are packed, with the
+              field names of the current generator (F1 24)
+        num_cars (int):
+            - Number of active cars, at most 22
+        frame_rate (float):
+            - Simulated frames per second, used for session time and rates
+        session_uid (int):
+            - Random if omitted
+        track_length (float):
+            - Track length in metres
+        total_laps (int):
+            - Laps until the chequered flag
+
+    """
+
+    def __init__(self, packets, num_cars: int = NUM_CARS, frame_rate: float = 60.0, session_uid: int = None,
+                 track_length: float = 5000.0, total_laps: int = 50):
+        self.num_cars = min(num_cars, NUM_CARS)
+        self.frame_rate = frame_rate
+        self.session_uid = session_uid if session_uid is not None else random.getrandbits(64)
+        self.track_length = track_length
+        self.total_laps = total_laps
+        self.frame = 0
+        self.session_time = 0.0
+
+        self._packets = {}
+        for (packet_format, packet_version, packet_id), packet_type in packets.HEADER_FIELD_TO_PACKET_TYPE.items():
+            self._packets[packet_type.__name__] = (packet_format, packet_version, packet_id, packet_type())
+        self._sent = {name: 0 for name in PACKET_RATES}
+
+        self._speeds = [80.0 - i * 0.15 + random.uniform(-0.5, 0.5) for i in range(self.num_cars)]
+        self._distances = [-i * 8.0 for i in range(self.num_cars)]
+        self._laps = [1] * self.num_cars
+        self._lap_started = [0.0] * self.num_cars
+        self._fuel = [100.0] * self.num_cars
+        self._fastest_lap = None
+        self._history_car = 0
+        self._events = [b"SSTA"]
+        self._finished = False
+
+        self._init_participants()
+
+    def step(self) -> list:
+        """Advances the simulation by one frame and returns the datagrams sent in it"""
+        self.frame += 1
+        self.session_time = self.frame / self.frame_rate
+        self._advance_cars(1 / self.frame_rate)
+
+        names = ["PacketMotionData", "PacketLapData", "PacketCarTelemetryData", "PacketCarStatusData",
+                 "PacketMotionExData"]
+        # the n-th packet of a rate is due n / rate seconds after the first frame, counted from the frame
+        # number so that rounding does not add up over the session
+        elapsed = (self.frame - 1) / self.frame_rate
+        for name, rate in PACKET_RATES.items():
+            if self._sent[name] <= elapsed * rate + 1e-9:
+                names.append(name)
+                self._sent[name] += 1
+        if not self._finished and self._laps[self._leader()] > self.total_laps:
+            self._finished = True
+            self._events.append(b"CHQF")
+            names.append("PacketFinalClassificationData")
+
+        datagrams = []
+        for name in names:
+            entry = self._packets.get(name)
+            if entry is None:
+                continue
+            getattr(self, "_update_" + name[len("Packet"):], _ignore)(entry[3])
+            datagrams.append(self._pack(*entry))
+
+        entry = self._packets.get("PacketEventData")
+        while self._events and entry is not None:
+            entry[3].event_string_code[:] = list(self._events.pop(0))
+            datagrams.append(self._pack(*entry))
+        return datagrams
+
+    def _pack(self, packet_format, packet_version, packet_id, packet):
+        data = bytearray(packet.pack())
+        PACKET_HEADER.pack_into(data, 0, packet_format, packet_format % 100, *GAME_VERSION, packet_version, packet_id,
+                         self.session_uid, self.session_time, self.frame, self.frame, 0, 255)
+        return bytes(data)
+
+    def _advance_cars(self, dt: float):
+        for i in range(self.num_cars):
+            self._speeds[i] += random.uniform(-0.3, 0.3)
+            self._speeds[i] = min(max(self._speeds[i], 40.0), 95.0)
+            self._distances[i] += self._speeds[i] * dt
+            if self._distances[i] >= self._laps[i] * self.track_length:
+                lap_time = self.session_time - self._lap_started[i]
+                self._lap_started[i] = self.session_time
+                self._laps[i] += 1
+                if self._laps[i] > 2 and (self._fastest_lap is None or lap_time < self._fastest_lap):
+                    self._fastest_lap = lap_time
+                    self._events.append(b"FTLP")
+            self._fuel[i] = max(self._fuel[i] - 0.0005 * self._speeds[i] * dt, 0.0)
+
+    def _leader(self) -> int:
+        return max(range(self.num_cars), key=lambda i: self._distances[i])
+
+    def _positions(self) -> list:
+        order = sorted(range(self.num_cars), key=lambda i: -self._distances[i])
+        positions = [0] * self.num_cars
+        for position, i in enumerate(order, start=1):
+            positions[i] = position
+        return positions
+
+    def _angle(self, i: int) -> float:
+        return 2 * math.pi * (self._distances[i] % self.track_length) / self.track_length
+
+    def _init_participants(self):
+        participants = self._packets.get("PacketParticipantsData")
+        if participants is None:
+            return
+        packet = participants[3]
+        _set(packet, "num_active_cars", self.num_cars)
+        for i in range(self.num_cars):
+            participant = packet.participants[i]
+            _set(participant, "ai_controlled", int(i > 0))
+            _set(participant, "driver_id", i)
+            _set(participant, "team_id", i // 2)
+            _set(participant, "race_number", i + 1)
+            _set(participant, "name", f"Driver {i + 1}".encode())
+            _set(participant, "show_online_names", 1)
+
+    def _update_MotionData(self, packet):
+        radius = self.track_length / (2 * math.pi)
+        for i in range(self.num_cars):
+            angle = self._angle(i)
+            car = packet.car_motion_data[i]
+            car.world_position_x = radius * math.cos(angle)
+            car.world_position_z = radius * math.sin(angle)
+            car.world_velocity_x = -self._speeds[i] * math.sin(angle)
+            car.world_velocity_z = self._speeds[i] * math.cos(angle)
+            car.g_force_lateral = self._speeds[i] ** 2 / radius / 9.81
+            car.yaw = angle
+
+    def _update_LapData(self, packet):
+        positions = self._positions()
+        for i in range(self.num_cars):
+            lap = packet.lap_data[i]
+            lap.current_lap_num = self._laps[i]
+            lap.current_lap_time_in_ms = int((self.session_time - self._lap_started[i]) * 1000)
+            lap.lap_distance = self._distances[i] % self.track_length
+            lap.total_distance = self._distances[i]
+            lap.car_position = positions[i]
+            lap.sector = min(int(3 * lap.lap_distance / self.track_length), 2)
+            lap.grid_position = i + 1
+            lap.driver_status = 4
+            lap.result_status = 2
+
+    def _update_CarTelemetryData(self, packet):
+        for i in range(self.num_cars):
+            car = packet.car_telemetry_data[i]
+            car.speed = int(self._speeds[i] * 3.6)
+            car.throttle = min(self._speeds[i] / 95.0, 1.0)
+            car.steer = math.sin(self._angle(i) * 8) * 0.2
+            car.gear = min(1 + int(self._speeds[i] / 12), 8)
+            car.engine_rpm = 8000 + int(self._speeds[i] * 40)
+
+    def _update_CarStatusData(self, packet):
+        for i in range(self.num_cars):
+            car = packet.car_status_data[i]
+            car.fuel_in_tank = self._fuel[i]
+            car.fuel_capacity = 110.0
+            car.max_rpm = 13000
+            car.idle_rpm = 4000
+            car.max_gears = 8
+            car.tyres_age_laps = self._laps[i] - 1
+
+    def _update_CarDamageData(self, packet):
+        for i in range(self.num_cars):
+            car = packet.car_damage_data[i]
+            for wheel in range(4):
+                # cars start behind the line, at a negative distance
+                car.tyres_wear[wheel] = min(max(self._distances[i] / self.track_length * 2.0, 0.0), 100.0)
+
+    def _update_SessionData(self, packet):
+        _set(packet, "track_length", int(self.track_length))
+        _set(packet, "total_laps", self.total_laps)
+        _set(packet, "session_type", 15)
+        _set(packet, "session_duration", 7200)
+        _set(packet, "session_time_left", max(7200 - int(self.session_time), 0))
+
+    def _update_SessionHistoryData(self, packet):
+        self._history_car = (self._history_car + 1) % self.num_cars
+        _set(packet, "car_idx", self._history_car)
+        _set(packet, "num_laps", min(self._laps[self._history_car], 100))
+
+    def _update_TyreSetsData(self, packet):
+        _set(packet, "car_idx", self._history_car)
+
+    def _update_FinalClassificationData(self, packet):
+        positions = self._positions()
+        _set(packet, "num_cars", self.num_cars)
+        for i in range(self.num_cars):
+            _set(packet.classification_data[i], "position", positions[i])
+            _set(packet.classification_data[i], "num_laps", self._laps[i] - 1)
+            _set(packet.classification_data[i], "result_status", 3)
+
+
+def _ignore(packet):
+    pass
+
+
+def _set(packet, name: str, value):
+    if hasattr(packet, name):
+        setattr(packet, name, value)
+
+
+def log_stats(stats: dict):
+    logger.info("generated %d packets, %.1f packets/s", stats["packets"], stats["packets_per_second"])
+
+
+def run(sessions: list, sock, rate: float = 60.0, duration: float = None, stats_interval: float = 1.0,
+        on_stats=log_stats, batch_size: int = 64) -> dict:
+    """Sends the datagrams of ``sessions`` to a connected socket
+
+    Args:
+        sessions (list):
+            - ``SyntheticSession`` instances, e.g. one per simulated rig
+        sock (socket.socket):
+            - A connected UDP socket
+        rate (float):
+            - Frames per second, ``0`` for as fast as possible
+        duration (float):
+            - Seconds to run, until interrupted if omitted
+        stats_interval (float):
+            - Seconds between two calls of ``on_stats``
+        on_stats (callable):
+            - Called with the stats ``dict`` of every interval
+        batch_size (int):
+            - Maximum number of datagrams per send syscall
+
+    """
+    batch = MessageBatch(batch_size)
+    started = time.monotonic()
+    interval_started = started
+    total = 0
+    interval_count = 0
+    frame = 0
+
+    while duration is None or time.monotonic() - started < duration:
+        datagrams = []
+        for session in sessions:
+            datagrams.extend(session.step())
+        for i in range(0, len(datagrams), batch_size):
+            batch.send(sock, datagrams[i:i + batch_size])
+        total += len(datagrams)
+        interval_count += len(datagrams)
+        frame += 1
+
+        now = time.monotonic()
+        if rate > 0:
+            delay = started + frame / rate - now
+            if delay > 0:
+                time.sleep(delay)
+                now = time.monotonic()
+        if now - interval_started >= stats_interval:
+            if on_stats is not None:
+                on_stats({"packets": interval_count, "packets_per_second": interval_count / (now - interval_started)})
+            interval_count = 0
+            interval_started = now
+
+    elapsed = time.monotonic() - started
+    return {"packets": total, "packets_per_second": total / elapsed if elapsed > 0 else 0.0}
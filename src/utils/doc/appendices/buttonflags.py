@@ -13,9 +13,8 @@ def get_table_content(table, value_key: str):
     id = ""
     value = ""
 
-    for i, row in enumerate(table.rows):
-        for j, cell in enumerate(row.cells):
-            text = cell.text
+    for i, row in enumerate(table):
+        for j, text in enumerate(row):
             if text == '\xa0' or text == '':
                 continue
             if text == "Bit Flag" or text == value_key:
@@ -15,9 +15,8 @@ def get_table_content(table, value_key: str):
     id = ""
     value = ""
 
-    for i, row in enumerate(table.rows):
-        for j, cell in enumerate(row.cells):
-            text = cell.text
+    for i, row in enumerate(table):
+        for j, text in enumerate(row):
             if "‘" in text:
                 text = text.replace("‘", "`")
             if text == '\xa0' or text == '':
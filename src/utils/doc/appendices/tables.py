@@ -1,18 +1,17 @@
-from docx import Document
+from utils.doc import spec
 
 
 def get_table_from_doc(file_path: str, id: int):
-    document = Document(file_path)
-    table = document.tables[id]
+    """Returns the rows of cell texts of table ``id``, the document is parsed once for all tables"""
+    table = spec.load(file_path).tables[id]
     return table
 
 
 def get_table_keys(table) -> dict:
-    row = table.rows[0]
+    row = table[0]
     keys = {}
-    for i, cell in enumerate(row.cells):
-        keys[i] = cell.text
-        i += 1
+    for i, text in enumerate(row):
+        keys[i] = text
     return keys
 
 
@@ -23,9 +22,8 @@ def get_table_content(table, value_key: str):
     id = ""
     value = ""
 
-    for i, row in enumerate(table.rows):
-        for j, cell in enumerate(row.cells):
-            text = cell.text
+    for i, row in enumerate(table):
+        for j, text in enumerate(row):
             if "‘" in text:
                 text = text.replace("‘", "`")
             if text == '\xa0' or text == '':
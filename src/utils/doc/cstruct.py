@@ -0,0 +1,219 @@
+import re
+
+# the start of a named declaration, the body is parsed from its brace on
+_DECLARATION = re.compile(r"\b(struct|union)\s+([A-Za-z_]\w*)\s*(?=\{)")
+
+_TOKEN = re.compile(r"""
+    \s+
+  | (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<word>[A-Za-z_]\w*)
+  | (?P<number>\d+)
+  | (?P<symbol>[{}\[\];,])
+  | (?P<other>.)
+""", re.S | re.X)
+
+_KINDS = ("struct", "union")
+_MEMBER_PREFIX = "m_"
+
+
+class StructParseError(Exception):
+    """Raised for a struct or union declaration that is not valid C"""
+
+
+class Field(object):
+    """A member of a struct or union
+
+    Attributes:
+        name (str):
+            - Name without the ``m_`` prefix, e.g. ``packetFormat``
+        type (str or Struct):
+            - The ``Struct`` of a struct or union declared before, else the
+              type name, e.g. ``uint16``
+        length (int):
+            - Elements of an array, 0 if it is no array
+        comment (str):
+            - Text of the comments after it
+
+    """
+
+    def __init__(self, name: str, type, length: int = 0, comment: str = ""):
+        self.name = name
+        self.type = type
+        self.length = length
+        self.comment = comment
+
+    @property
+    def type_name(self) -> str:
+        return self.type.name if isinstance(self.type, Struct) else self.type
+
+    def __repr__(self):
+        length = f"[{self.length}]" if self.length else ""
+        return f"Field({self.type_name} {self.name}{length})"
+
+
+class Struct(object):
+    """A struct or union declaration
+
+    Attributes:
+        name (str):
+            - Name, None for the anonymous structs of union members
+        kind (str):
+            - ``"struct"`` or ``"union"``
+        fields (list):
+            - The ``Field``s in declaration order
+        comment (str):
+            - Text of the comments before its first field
+
+    """
+
+    def __init__(self, name: str, kind: str = "struct", fields: list = None, comment: str = ""):
+        self.name = name
+        self.kind = kind
+        self.fields = [] if fields is None else fields
+        self.comment = comment
+
+    @property
+    def is_union(self) -> bool:
+        return self.kind == "union"
+
+    def __repr__(self):
+        return f"Struct({self.kind} {self.name}, {len(self.fields)} fields)"
+
+
+class _Tokens(object):
+    """The tokens of ``text`` from ``position`` on, whitespace skipped"""
+
+    def __init__(self, text: str, position: int):
+        self.text = text
+        self.seek(position)
+
+    def seek(self, position: int):
+        self.position = position
+        self._match = _TOKEN.scanner(self.text, position).match
+
+    def next(self):
+        """Returns the kind and value of the next token, ``(None, None)`` at the end of the text"""
+        match = self._match()
+        while match is not None and match.lastgroup is None:
+            match = self._match()
+        if match is None:
+            self.position = len(self.text)
+            return None, None
+        self.position = match.end()
+        kind = match.lastgroup
+        return kind, match.group(kind)
+
+    def error(self, message: str) -> StructParseError:
+        start = self.text.rfind("\n", 0, self.position - 1) + 1
+        end = self.text.find("\n", self.position)
+        line = self.text[start:end if end >= 0 else len(self.text)].strip()
+        return StructParseError(f"{message} at offset {self.position}: {line!r}")
+
+
+def _append_comment(comment: str, text: str) -> str:
+    text = text[2:-2] if text.startswith("/*") else text[2:]
+    text = text.strip()
+    return f"{comment} {text}" if comment and text else comment or text
+
+
+def _parse_body(tokens: _Tokens, struct: Struct, declared: dict):
+    """Parses the members of ``struct`` up to and including its closing brace"""
+    kind, value = tokens.next()
+    if value != "{":
+        raise tokens.error("expected '{'")
+    fields = struct.fields
+    kind, value = tokens.next()
+    while value != "}":
+        if kind == "comment":
+            if fields:
+                fields[-1].comment = _append_comment(fields[-1].comment, value)
+            else:
+                struct.comment = _append_comment(struct.comment, value)
+            kind, value = tokens.next()
+            continue
+        if kind != "word":
+            raise tokens.error("expected a member" if kind else "unterminated declaration")
+
+        if value in _KINDS:
+            # the anonymous struct of a union member, or a nested declaration
+            field_type = Struct(None, value)
+            position = tokens.position
+            kind, value = tokens.next()
+            if kind == "word":
+                field_type.name = value
+            else:
+                tokens.seek(position)
+            _parse_body(tokens, field_type, declared)
+            if field_type.name is not None:
+                declared[field_type.name] = field_type
+            kind, value = tokens.next()
+        else:
+            field_type = declared.get(value, value)
+            kind, value = tokens.next()
+            if value == ";" or value == "[":
+                # a read error of the document glued type and name together, like uint8m_foo
+                split = field_type.find(_MEMBER_PREFIX, 1) if isinstance(field_type, str) else -1
+                if split < 0:
+                    raise tokens.error("expected a type and a name")
+                kind, value = "word", field_type[split:]
+                field_type = declared.get(field_type[:split], field_type[:split])
+                tokens.seek(tokens.position - 1)
+
+        while True:
+            if kind != "word":
+                raise tokens.error("expected a name")
+            name = value[len(_MEMBER_PREFIX):] if value.startswith(_MEMBER_PREFIX) else value
+            length = 0
+            kind, value = tokens.next()
+            if value == "[":
+                kind, value = tokens.next()
+                if kind != "number":
+                    raise tokens.error("expected an array length")
+                length = int(value)
+                kind, value = tokens.next()
+                if value != "]":
+                    raise tokens.error("expected ']'")
+                kind, value = tokens.next()
+                if value == "[":
+                    raise tokens.error("multidimensional arrays are not supported")
+            fields.append(Field(name, field_type, length))
+            if value != ",":
+                break
+            kind, value = tokens.next()
+        if value != ";":
+            raise tokens.error("expected ';'")
+        kind, value = tokens.next()
+
+
+def parse(text: str) -> list:
+    """Returns the ``Struct`` of every named struct and union declared in ``text``, in order
+
+    Everything around the declarations, like the prose of the spec, is
+    skipped. Fields whose type is declared before them refer to its
+    ``Struct``.
+
+    Raises:
+        StructParseError: if a declaration is not valid C
+
+    """
+    structs = []
+    declared = {}
+    position = 0
+    while True:
+        match = _DECLARATION.search(text, position)
+        if match is None:
+            return structs
+        struct = Struct(match.group(2), match.group(1))
+        tokens = _Tokens(text, match.end())
+        _parse_body(tokens, struct, declared)
+        structs.append(struct)
+        declared[struct.name] = struct
+        position = tokens.position
+
+
+def parse_struct(text: str) -> Struct:
+    """Returns the ``Struct`` of the first declaration in ``text``"""
+    structs = parse(text)
+    if not structs:
+        raise StructParseError("no struct declaration")
+    return structs[0]
@@ -1,8 +1,161 @@
 import zipfile
-import re
+import xml.etree.ElementTree as ElementTree
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+_BODY = W + "body"
+_PARAGRAPH = W + "p"
+_RUN = W + "r"
+_TEXT = W + "t"
+_BREAK = W + "br"
+_TABLE = W + "tbl"
+_ROW = W + "tr"
+_ROW_PROPERTIES = W + "trPr"
+_GRID_BEFORE = W + "gridBefore"
+_CELL = W + "tc"
+_CELL_PROPERTIES = W + "tcPr"
+_GRID_SPAN = W + "gridSpan"
+_VERTICAL_MERGE = W + "vMerge"
+_VALUE = W + "val"
+_TYPE = W + "type"
+
+# run children that stand for characters, besides w:t and w:br, like in python-docx' Run.text
+_RUN_CHARACTERS = {
+    W + "tab": "\t",
+    W + "ptab": "\t",
+    W + "cr": "\n",
+    W + "noBreakHyphen": "-",
+}
+
+# paragraph content without text of the paragraph: properties, deleted and moved away runs
+_SKIPPED = frozenset((W + "pPr", W + "del", W + "moveFrom"))
+
+
+def _paragraph_text(paragraph) -> str:
+    parts = []
+    _append_runs(paragraph, parts)
+    return "".join(parts)
+
+
+def _append_runs(element, parts: list):
+    """Appends the text of the runs in ``element``, including hyperlinks, insertions, content controls and fields"""
+    for child in element:
+        tag = child.tag
+        if tag != _RUN:
+            if tag not in _SKIPPED:
+                _append_runs(child, parts)
+            continue
+        for item in child:
+            tag = item.tag
+            if tag == _TEXT:
+                if item.text:
+                    parts.append(item.text)
+            elif tag in _RUN_CHARACTERS:
+                parts.append(_RUN_CHARACTERS[tag])
+            elif tag == _BREAK and item.get(_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+
+
+def _row_cells(row, above: dict, texts: dict):
+    """Returns the cell texts of ``row`` and the ``(text, span)`` of its cells by grid column
+
+    ``above`` is the latter of the previous row, ``texts`` the texts of the paragraphs.
+    """
+    cells = []
+    grid = {}
+    column = 0
+    for cell in row:
+        if cell.tag == _ROW_PROPERTIES:
+            grid_before = cell.find(_GRID_BEFORE)
+            if grid_before is not None:
+                column = int(grid_before.get(_VALUE, 0))
+            continue
+        if cell.tag != _CELL:
+            continue
+        span = 1
+        merged = False
+        properties = cell.find(_CELL_PROPERTIES)
+        if properties is not None:
+            grid_span = properties.find(_GRID_SPAN)
+            if grid_span is not None:
+                span = int(grid_span.get(_VALUE, 1))
+            vertical_merge = properties.find(_VERTICAL_MERGE)
+            merged = vertical_merge is not None and vertical_merge.get(_VALUE, "continue") == "continue"
+        if merged:
+            # the continuation of a vertically merged cell has the content of its first cell
+            text, span = above.get(column, ("", span))
+        else:
+            text = "\n".join([texts.pop(paragraph, "") for paragraph in cell if paragraph.tag == _PARAGRAPH])
+        cells.extend([text] * span)
+        grid[column] = (text, span)
+        column += span
+    return cells, grid
+
+
+def iter_doc(path: str):
+    """Yields the paragraphs and tables of the .docx at ``path`` in document order
+
+    Streams ``word/document.xml`` with ``iterparse`` and drops every part of
+    the body once it is done with, so memory is bounded by the largest table
+    rather than by the document. Every paragraph, including the ones in table
+    cells, is yielded as ``("paragraph", text)``; every table outside of other
+    tables once it ends as ``("table", rows)``, every row a list of cell
+    texts. Tabs and line breaks are kept, the text of inserted runs,
+    hyperlinks, content controls and fields is included and deleted text is
+    left out. Like in python-docx, a cell spanning several grid columns is
+    repeated and a vertically merged cell has the text of its first cell.
+    ``path`` may also be a binary file object.
+    """
+    with zipfile.ZipFile(path) as docx, docx.open("word/document.xml") as document:
+        body = None
+        # per open table: its rows and the (text, span) by grid column of its latest row
+        tables = []
+        # texts of the paragraphs in open tables, until their cell is read
+        texts = {}
+        for event, element in ElementTree.iterparse(document, events=("start", "end")):
+            tag = element.tag
+            if event == "start":
+                if tag == _TABLE:
+                    tables.append([[], {}])
+                elif tag == _BODY:
+                    body = element
+                continue
+
+            if tag == _PARAGRAPH:
+                text = _paragraph_text(element)
+                if tables:
+                    texts[element] = text
+                yield "paragraph", text
+            elif tag == _ROW:
+                table = tables[-1]
+                cells, table[1] = _row_cells(element, table[1], texts)
+                table[0].append(cells)
+                continue
+            elif tag == _TABLE:
+                rows = tables.pop()[0]
+                if tables:
+                    continue
+                texts.clear()
+                yield "table", rows
+            else:
+                continue
+
+            if not tables and body is not None:
+                # the top level paragraph or table is done with, so is everything before it
+                body.clear()
+
+
+def read_doc(path: str):
+    """Returns the text, the paragraphs joined by new lines, and the tables of the .docx at ``path``"""
+    paragraphs = []
+    tables = []
+    for kind, value in iter_doc(path):
+        if kind == "paragraph":
+            paragraphs.append(value)
+        else:
+            tables.append(value)
+    return "\n".join(paragraphs), tables
+
 
 def get_str_from_doc(path: str):
-    docx = zipfile.ZipFile(path)
-    content = docx.read('word/document.xml').decode('utf-8')
-    cleaned = re.sub('<(.|n)*?>', '', content)
-    return cleaned
\ No newline at end of file
+    return "\n".join(text for kind, text in iter_doc(path) if kind == "paragraph")
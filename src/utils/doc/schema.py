@@ -0,0 +1,160 @@
+from utils.doc import spec
+from utils.doc.cstruct import Struct, parse
+from utils.doc.load_structs import format_attr_name
+
+# size in bytes and ``struct`` module format character of the base types of the spec
+BASE_TYPES = {
+    "int8": (1, "b"),
+    "uint8": (1, "B"),
+    "int16": (2, "h"),
+    "uint16": (2, "H"),
+    "int32": (4, "i"),
+    "uint32": (4, "I"),
+    "int64": (8, "q"),
+    "uint64": (8, "Q"),
+    "float": (4, "f"),
+    "double": (8, "d"),
+    "char": (1, "c"),
+}
+
+
+class SchemaError(Exception):
+    """Raised for a field whose type is neither a base type nor a struct declared before"""
+
+
+class SchemaField(object):
+    """A field of a ``SchemaStruct`` with its place in the packed layout
+
+    Attributes:
+        name (str):
+            - snake_case name, e.g. ``packet_format``
+        spec_name (str):
+            - Name in the spec without the ``m_`` prefix, e.g. ``packetFormat``
+        type (str or SchemaStruct):
+            - Base type name, e.g. ``uint16``, or the struct of the field
+        length (int):
+            - Elements of an array, 0 if it is no array
+        offset (int):
+            - Offset in bytes from the start of the struct
+        size (int):
+            - Size in bytes, of all elements of an array
+        comment (str):
+            - The spec's comment of the field
+
+    """
+
+    def __init__(self, name: str, spec_name: str, type, length: int, offset: int, size: int, comment: str = ""):
+        self.name = name
+        self.spec_name = spec_name
+        self.type = type
+        self.length = length
+        self.offset = offset
+        self.size = size
+        self.comment = comment
+
+    @property
+    def type_name(self) -> str:
+        return self.type.name if isinstance(self.type, SchemaStruct) else self.type
+
+    @property
+    def is_struct(self) -> bool:
+        return isinstance(self.type, SchemaStruct)
+
+    def __repr__(self):
+        length = f"[{self.length}]" if self.length else ""
+        return f"SchemaField({self.type_name} {self.name}{length} @{self.offset}+{self.size})"
+
+
+class SchemaStruct(object):
+    """A packed struct of the spec
+
+    Attributes:
+        name (str):
+            - Name, e.g. ``PacketHeader``
+        fields (list):
+            - The ``SchemaField``s in layout order
+        size (int):
+            - Size in bytes
+        comment (str):
+            - The spec's comment of the struct
+
+    """
+
+    def __init__(self, name: str, fields: list, size: int, comment: str = ""):
+        self.name = name
+        self.fields = fields
+        self.size = size
+        self.comment = comment
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __repr__(self):
+        return f"SchemaStruct({self.name}, {len(self.fields)} fields, {self.size} bytes)"
+
+
+class Schema(object):
+    """The structs of a spec, in declaration order, with the layout the game sends them in
+
+    Iterating yields the ``SchemaStruct``s, ``schema[name]`` returns one by
+    name. Fields of unions are left out, the layout of the event details
+    depends on the event code.
+    """
+
+    def __init__(self, structs: list):
+        self.structs = {struct.name: struct for struct in structs}
+
+    @classmethod
+    def from_structs(cls, structs: list) -> "Schema":
+        """Returns the schema of the ``Struct``s of ``cstruct.parse``
+
+        Raises:
+            SchemaError: if the type of a field is unknown
+
+        """
+        schema_structs = {}
+        for struct in structs:
+            if struct.is_union:
+                continue
+            fields = []
+            offset = 0
+            for field in struct.fields:
+                if isinstance(field.type, Struct):
+                    if field.type.is_union:
+                        continue
+                    field_type = schema_structs.get(field.type.name)
+                    if field_type is None:
+                        raise SchemaError(f"{struct.name}.{field.name} has the undeclared struct {field.type.name}")
+                    element_size = field_type.size
+                elif field.type in BASE_TYPES:
+                    field_type = field.type
+                    element_size = BASE_TYPES[field.type][0]
+                else:
+                    raise SchemaError(f"{struct.name}.{field.name} has the unknown type {field.type}")
+                size = element_size * max(field.length, 1)
+                fields.append(SchemaField(
+                    format_attr_name(field.name), field.name, field_type, field.length, offset, size, field.comment))
+                offset += size
+            schema_structs[struct.name] = SchemaStruct(struct.name, fields, offset, struct.comment)
+        return cls(list(schema_structs.values()))
+
+    @classmethod
+    def from_text(cls, text: str) -> "Schema":
+        return cls.from_structs(parse(text))
+
+    def __iter__(self):
+        return iter(self.structs.values())
+
+    def __len__(self):
+        return len(self.structs)
+
+    def __getitem__(self, name: str) -> SchemaStruct:
+        return self.structs[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.structs
+
+
+def load(spec_path: str) -> Schema:
+    """Returns the ``Schema`` of the spec document at ``spec_path``"""
+    return Schema.from_text(spec.load(spec_path).text)
@@ -0,0 +1,117 @@
+import functools
+import hashlib
+import json
+import os
+import tempfile
+
+from utils.doc import load as _load_module
+from utils.doc.load import read_doc
+
+# Directory of the cached extractions, an empty value disables the cache
+CACHE_DIR_ENV = "F1_SPEC_CACHE"
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "f1_udp_socket", "spec")
+
+
+class Spec(object):
+    """Everything the generators read from a spec document, extracted in one pass
+
+    Args:
+        path (str):
+            - Path of the EA spec .docx
+        text (str):
+            - The document's text, see ``get_str_from_doc``
+        tables (list):
+            - Every table as a list of rows, every row a list of cell texts
+
+    """
+
+    def __init__(self, path: str, text: str, tables: list):
+        self.path = path
+        self.text = text
+        self.tables = tables
+
+    @classmethod
+    def from_document(cls, path: str) -> "Spec":
+        """Parses the document at ``path``"""
+        text, tables = read_doc(path)
+        return cls(path, text, tables)
+
+
+def _hash_file(path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def extractor_version() -> str:
+    """Returns the hash of the extraction code, cached extractions of another version are ignored"""
+    sha256 = hashlib.sha256()
+    for module_path in (__file__, _load_module.__file__):
+        with open(module_path, "rb") as file:
+            sha256.update(file.read())
+    return sha256.hexdigest()[:16]
+
+
+def cache_dir() -> str:
+    return os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)
+
+
+def _cache_path(directory: str, path: str) -> str:
+    return os.path.join(directory, f"{_hash_file(path)}-{extractor_version()}.json")
+
+
+def _read_cache(cache_path: str):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(cache_path: str, spec: Spec):
+    directory = os.path.dirname(cache_path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        # write to a temporary file first, so concurrent runs never read a partial entry
+        fd, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump({"text": spec.text, "tables": spec.tables}, file)
+        os.replace(temporary, cache_path)
+    except BaseException as e:
+        os.unlink(temporary)
+        if not isinstance(e, OSError):
+            raise
+
+
+@functools.lru_cache(maxsize=None)
+def _load(path: str) -> Spec:
+    directory = cache_dir()
+    if not directory:
+        return Spec.from_document(path)
+    cache_path = _cache_path(directory, path)
+    cached = _read_cache(cache_path)
+    if cached is not None:
+        return Spec(path, cached["text"], cached["tables"])
+    spec = Spec.from_document(path)
+    _write_cache(cache_path, spec)
+    return spec
+
+
+def load(path: str) -> Spec:
+    """Returns the ``Spec`` of ``path``
+
+    The document is parsed only the first time per process, and only once
+    at all while its content and the extraction code stay the same: the
+    extraction is kept in ``cache_dir()``, keyed by the SHA-256 of the
+    document and ``extractor_version()``. Set the environment variable
+    ``F1_SPEC_CACHE`` to another directory, or to an empty value to disable
+    the cache.
+    """
+    return _load(os.path.realpath(path))
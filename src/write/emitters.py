@@ -0,0 +1,126 @@
+import json
+
+from utils.doc.schema import BASE_TYPES
+
+
+class Emitter(object):
+    """Renders the structs of a ``Schema`` as source code or data
+
+    A new output format is a subclass implementing ``struct``.
+    """
+
+    def struct(self, struct) -> str:
+        """Returns the rendering of one ``SchemaStruct``"""
+        raise NotImplementedError
+
+    def emit(self, schema) -> str:
+        """Returns the rendering of every struct of ``schema``"""
+        return "".join(self.struct(struct) + "\n\n" for struct in schema)
+
+
+class CtypesEmitter(Emitter):
+    """``Packet`` subclasses for the ctypes template ``packets.py.templ``"""
+
+    def field_type(self, field) -> str:
+        type_class = field.type_name if field.is_struct else f"ctypes.c_{field.type}"
+        if field.length > 0:
+            return f"{type_class} * {field.length}"
+        return type_class
+
+    def struct(self, struct) -> str:
+        tab = "\t"
+        class_str = f"class {struct.name}(Packet):\n"
+        class_str += f"{tab}_fields_ = [\n"
+        for field in struct:
+            class_str += f"{tab}{tab}(\"{field.name}\", {self.field_type(field)}),\n"
+        class_str += f"{tab}]\n"
+        return class_str
+
+
+_dtype_types = {
+    'int8': 'i1',
+    'int16': '<i2',
+    'int32': '<i4',
+    'int64': '<i8',
+    'uint8': 'u1',
+    'uint16': '<u2',
+    'uint32': '<u4',
+    'uint64': '<u8',
+    'float': '<f4',
+    'char': 'S1',
+    'double': '<f8'
+}
+
+
+class DtypeEmitter(Emitter):
+    """Packed NumPy structured dtypes for the template ``dtypes.py.templ``"""
+
+    def struct(self, struct) -> str:
+        tab = "\t"
+        dtype_str = f"{struct.name} = np.dtype([\n"
+        for field in struct:
+            dtype = field.type_name if field.is_struct else f"\"{_dtype_types[field.type]}\""
+            if field.length > 0 and field.type == "char":
+                dtype_str += f"{tab}(\"{field.name}\", \"S{field.length}\"),\n"
+            elif field.length > 0:
+                dtype_str += f"{tab}(\"{field.name}\", {dtype}, ({field.length},)),\n"
+            else:
+                dtype_str += f"{tab}(\"{field.name}\", {dtype}),\n"
+        dtype_str += "])\n"
+        return dtype_str
+
+
+class StructFormatEmitter(Emitter):
+    """Little-endian ``struct.Struct``s unpacking a struct into the flat tuple of its leaf values
+
+    Nested structs and arrays of structs are expanded in place, ``char``
+    arrays are one ``bytes`` value.
+    """
+
+    def format(self, struct) -> str:
+        return "<" + self._format(struct)
+
+    def _format(self, struct) -> str:
+        parts = []
+        for field in struct:
+            if field.is_struct:
+                parts.append(self._format(field.type) * max(field.length, 1))
+            elif field.type == "char" and field.length > 0:
+                parts.append(f"{field.length}s")
+            elif field.length > 0:
+                parts.append(f"{field.length}{BASE_TYPES[field.type][1]}")
+            else:
+                parts.append(BASE_TYPES[field.type][1])
+        return "".join(parts)
+
+    def struct(self, struct) -> str:
+        return f"{struct.name} = struct.Struct(\"{self.format(struct)}\")\n"
+
+
+class JsonEmitter(Emitter):
+    """The fields of every struct as nested JSON objects
+
+    Fields of structs are their object, arrays a list of their element. The
+    keys are the spec's camelCase names, like in the files under ``data``.
+    """
+
+    def to_dict(self, struct) -> dict:
+        fields = {}
+        for field in struct:
+            value = self.to_dict(field.type) if field.is_struct else field.type
+            fields[field.spec_name] = [value] * field.length if field.length > 0 else value
+        return fields
+
+    def struct(self, struct) -> str:
+        return json.dumps(self.to_dict(struct), indent=4)
+
+    def emit(self, schema) -> str:
+        return json.dumps({struct.name: self.to_dict(struct) for struct in schema}, indent=4)
+
+
+EMITTERS = {
+    "ctypes": CtypesEmitter,
+    "dtype": DtypeEmitter,
+    "struct": StructFormatEmitter,
+    "json": JsonEmitter,
+}
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from udp.aio import COALESCE, DROP_NEWEST, POLICIES, Subscription, SubscriptionClosed
+
+
+class Motion(object):
+    pass
+
+
+class Lap(object):
+    pass
+
+
+def drain(subscription: Subscription) -> list:
+    async def get_all():
+        subscription.close()
+        return [item async for item in subscription]
+    return asyncio.run(get_all())
+
+
+def test_subscription_passes_the_address():
+    subscription = Subscription(maxsize=4, policy=DROP_NEWEST)
+    first, second = Motion(), Motion()
+    subscription.put(first, ("10.0.0.1", 20777))
+    subscription.put(second, ("10.0.0.2", 20777))
+    assert drain(subscription) == [(first, ("10.0.0.1", 20777)), (second, ("10.0.0.2", 20777))]
+
+
+def test_coalesce_keeps_the_latest_packet_per_type_and_source():
+    subscription = Subscription(maxsize=4, policy=COALESCE)
+    a, b = ("10.0.0.1", 20777), ("10.0.0.2", 20777)
+    old_a, new_a, only_b, lap = Motion(), Motion(), Motion(), Lap()
+    subscription.put(old_a, a)
+    subscription.put(only_b, b)
+    subscription.put(lap, a)
+    subscription.put(new_a, a)
+    assert drain(subscription) == [(new_a, a), (only_b, b), (lap, a)]
+    assert subscription.dropped == 1
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+def test_maxsize_has_to_be_positive(policy):
+    with pytest.raises(ValueError, match="maxsize"):
+        Subscription(maxsize=0, policy=policy)
+
+
+def test_get_after_close_raises_subscription_closed():
+    async def get_after_close():
+        subscription = Subscription(maxsize=2)
+        packet = Motion()
+        subscription.put(packet)
+        subscription.close()
+        assert await subscription.get() == (packet, None)
+        with pytest.raises(SubscriptionClosed):
+            await subscription.get()
+    asyncio.run(get_after_close())
@@ -0,0 +1,69 @@
+import ctypes
+import importlib.util
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from udp import batch, packets
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "F124")
+
+
+@pytest.fixture(scope="module")
+def packets_module():
+    return packets.load(os.path.join(DATA_PATH, "packets.py"))
+
+
+@pytest.fixture(scope="module")
+def dtypes():
+    spec = importlib.util.spec_from_file_location("f124_dtypes", os.path.join(DATA_PATH, "dtypes.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def check_layout(ctypes_class, dtype):
+    assert dtype.itemsize == ctypes.sizeof(ctypes_class), ctypes_class.__name__
+    for name, field_type in ctypes_class._fields_:
+        field_dtype, offset = dtype.fields[name][:2]
+        assert offset == getattr(ctypes_class, name).offset, f"{ctypes_class.__name__}.{name}"
+        element_type = field_type
+        while issubclass(element_type, ctypes.Array):
+            element_type = element_type._type_
+        if issubclass(element_type, ctypes.Structure):
+            check_layout(element_type, field_dtype.base)
+
+
+def test_dtypes_match_the_ctypes_classes(packets_module, dtypes):
+    for packet_type in packets_module.HEADER_FIELD_TO_PACKET_TYPE.values():
+        check_layout(packet_type, getattr(dtypes, packet_type.__name__))
+
+
+def test_decode_columns(packets_module, dtypes):
+    datagrams = []
+    for frame in range(3):
+        packet = packets_module.PacketCarTelemetryData()
+        packet.header.packet_id = 6
+        packet.header.frame_identifier = frame
+        for car in range(22):
+            packet.car_telemetry_data[car].speed = frame * 100 + car
+            packet.car_telemetry_data[car].tyres_pressure[2] = car / 2
+        datagrams.append(bytes(packet))
+    # a longer datagram is cut to the dtype's size
+    datagrams[1] += b"\x00" * 4
+
+    assert list(batch.group_by_packet_id(datagrams)) == [6]
+    result = batch.decode_columns(datagrams, dtypes.PacketCarTelemetryData)
+    assert result["header.frame_identifier"].tolist() == [0, 1, 2]
+    assert result["speed"].shape == (3, 22)
+    assert result["speed"][2, 5] == 205
+    assert result["tyres_pressure"].shape == (3, 22, 4)
+    assert result["tyres_pressure"][1, 4, 2] == 2.0
+    assert result["suggested_gear"].shape == (3,)
+
+
+def test_decode_rejects_short_datagrams(dtypes):
+    with pytest.raises(ValueError, match="shorter"):
+        batch.decode([b"\x00" * 10], dtypes.PacketCarTelemetryData)
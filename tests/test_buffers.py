@@ -0,0 +1,35 @@
+import pytest
+
+from udp.buffers import BufferPool, BufferPoolExhausted
+
+
+def test_release_makes_buffer_available_again():
+    pool = BufferPool(count=2, size=16)
+    first = pool.acquire()
+    second = pool.acquire()
+    with pytest.raises(BufferPoolExhausted):
+        pool.acquire()
+    pool.release(first)
+    assert pool.acquire() == first
+    pool.release(second)
+    assert len(pool) == 1
+
+
+def test_double_release_raises():
+    pool = BufferPool(count=2, size=16)
+    index = pool.acquire()
+    pool.release(index)
+    with pytest.raises(ValueError):
+        pool.release(index)
+    # the buffer is handed out once only
+    assert sorted([pool.acquire(), pool.acquire()]) == [0, 1]
+
+
+def test_release_of_free_or_foreign_buffer_raises():
+    pool = BufferPool(count=2, size=16)
+    with pytest.raises(ValueError):
+        pool.release(0)
+    with pytest.raises(ValueError):
+        pool.release(2)
+    with pytest.raises(ValueError):
+        pool.release(-1)
@@ -0,0 +1,99 @@
+import pytest
+
+from utils.doc.cstruct import StructParseError, parse, parse_struct
+
+
+def test_glued_type_and_name():
+    struct = parse_struct("struct CarSetupData\n{\n    uint8m_frontWing; // Front wing aero\n    float m_rearWing;\n};")
+    assert [(field.type, field.name) for field in struct.fields] == [("uint8", "frontWing"), ("float", "rearWing")]
+    assert struct.fields[0].comment == "Front wing aero"
+
+
+def test_glued_array():
+    struct = parse_struct("struct Packet { uint8m_tyres[4]; };")
+    field = struct.fields[0]
+    assert (field.type, field.name, field.length) == ("uint8", "tyres", 4)
+
+
+def test_array_lengths_and_declared_types():
+    structs = parse("""
+        struct LapData { float m_lastLapTime; };
+        struct PacketLapData
+        {
+            LapData m_lapData[22];          // Lap data for all cars on track
+            uint8   m_timeTrialPBCarIdx, m_timeTrialRivalCarIdx;
+            char    m_name[48];
+        };
+    """)
+    lap_data, packet = structs
+    assert [(field.type_name, field.name, field.length) for field in packet.fields] == [
+        ("LapData", "lapData", 22),
+        ("uint8", "timeTrialPBCarIdx", 0),
+        ("uint8", "timeTrialRivalCarIdx", 0),
+        ("char", "name", 48),
+    ]
+    assert packet.fields[0].type is lap_data
+    assert packet.fields[0].comment == "Lap data for all cars on track"
+
+
+def test_trailing_comments():
+    struct = parse_struct("""
+        struct PacketHeader
+        {
+            // The header of every packet
+            uint16 m_packetFormat;  // 2024
+            uint8  m_gameYear;      // Game year - last two digits
+                                    // e.g. 24
+            uint8  m_gameMajorVersion; /* X.00 */
+        };
+    """)
+    assert struct.comment == "The header of every packet"
+    assert [field.comment for field in struct.fields] == ["2024", "Game year - last two digits e.g. 24", "X.00"]
+
+
+def test_union_of_anonymous_structs():
+    structs = parse("""
+        union EventDataDetails
+        {
+            struct
+            {
+                uint8 vehicleIdx; // Vehicle index of car achieving fastest lap
+                float lapTime;
+            } FastestLap;
+
+            struct
+            {
+                uint8 vehicleIdx;
+            } Retirement;
+        };
+
+        struct PacketEventData
+        {
+            uint8           m_eventStringCode[4];
+            EventDataDetails m_eventDetails;
+        };
+    """)
+    union, packet = structs
+    assert union.is_union and union.name == "EventDataDetails"
+    assert [field.name for field in union.fields] == ["FastestLap", "Retirement"]
+    fastest_lap = union.fields[0].type
+    assert fastest_lap.name is None and fastest_lap.kind == "struct"
+    assert [(field.type, field.name) for field in fastest_lap.fields] == [("uint8", "vehicleIdx"), ("float", "lapTime")]
+    assert packet.fields[1].type is union
+
+
+def test_prose_around_declarations_is_skipped():
+    structs = parse("The struct below is sent 2 times per second.\nstruct A { uint8 m_a; };\nA struct { is prose.")
+    assert [struct.name for struct in structs] == ["A"]
+
+
+def test_unterminated_struct():
+    with pytest.raises(StructParseError):
+        parse("struct PacketHeader\n{\n    uint16 m_packetFormat;\n    uint8 m_gameYear;\n\nThe next section is prose.")
+    with pytest.raises(StructParseError, match="unterminated declaration"):
+        parse("struct PacketHeader\n{\n    uint16 m_packetFormat;\n")
+
+
+def test_no_declaration():
+    with pytest.raises(StructParseError):
+        parse_struct("no structs here")
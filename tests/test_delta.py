@@ -0,0 +1,45 @@
+import os
+import struct
+
+import pytest
+
+from udp import packets
+from udp.delta import DeltaDecoder, DeltaEncoder
+
+PACKETS_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "F124", "packets.py")
+
+
+@pytest.fixture(scope="module")
+def packets_module():
+    return packets.load(PACKETS_PATH)
+
+
+def telemetry(packets_module, speed: int) -> bytes:
+    packet = packets_module.PacketCarTelemetryData()
+    packet.header.packet_format = 2024
+    packet.header.packet_version = 1
+    packet.header.packet_id = 6
+    packet.header.session_uid = 42
+    packet.car_telemetry_data[0].speed = speed
+    return bytes(packet)
+
+
+def test_truncated_datagram_is_skipped(packets_module):
+    encoder = DeltaEncoder(packets_module)
+    assert encoder.encode(b"\x00\x01\x02") is None
+    assert encoder.encode(memoryview(telemetry(packets_module, 1))[:14]) is None
+    assert encoder.skipped == 2
+    # the streams of complete datagrams are not affected
+    decoder = DeltaDecoder()
+    for speed in (100, 101, 102):
+        datagram = telemetry(packets_module, speed)
+        assert decoder.decode(encoder.encode(datagram)) == datagram
+
+
+def test_delta_is_smaller_than_the_datagram(packets_module):
+    encoder = DeltaEncoder(packets_module)
+    encoder.encode(telemetry(packets_module, 100))
+    message = encoder.encode(telemetry(packets_module, 101))
+    assert message[:1] == b"D"
+    assert len(message) < 32
+    assert struct.unpack_from("<H", message, 10)[0] == 1
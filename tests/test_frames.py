@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from udp import packets
+from udp.frames import DEFAULT_REQUIRED, FrameAssembler
+from udp.synthetic import SyntheticSession
+
+PACKETS_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "F124", "packets.py")
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(scope="module")
+def packets_module():
+    return packets.load(PACKETS_PATH)
+
+
+def assemble(packets_module, ticks: list, clock: Clock):
+    frames = []
+    assembler = FrameAssembler(frames.append, clock=clock)
+    dispatch = packets_module.HEADER_FIELD_TO_PACKET_TYPE
+    for datagrams in ticks:
+        for datagram in datagrams:
+            packet_type = dispatch[(2024, 1, datagram[6])]
+            assembler.add(packet_type.unpack(datagram))
+        clock.now += 1 / 60
+    return assembler, frames
+
+
+def test_full_ticks_in_order_are_not_late(packets_module):
+    session = SyntheticSession(packets_module, session_uid=7)
+    ticks = [session.step() for _ in range(300)]
+    assembler, frames = assemble(packets_module, ticks, Clock())
+
+    assert assembler.stats["late"] == 0
+    assert assembler.stats["incomplete"] == 0
+    # the latest frame stays open until the next tick starts
+    assert len(frames) == 299
+    assembler.flush()
+    assert len(frames) == 300
+    assert [frame.overall_frame_identifier for frame in frames] == list(range(1, 301))
+
+    for frame, datagrams in zip(frames, ticks):
+        assert frame.complete
+        assert len(frame.packets) + len(frame.extra) >= len(datagrams)
+        names = [type(packet).__name__ for packet in frame.extra]
+        assert "PacketMotionExData" in names
+        assert not set(names) & set(DEFAULT_REQUIRED)
+    assert sum(len(frame.extra) for frame in frames) == sum(len(datagrams) - 4 for datagrams in ticks)
+
+
+def test_packet_of_closed_frame_is_late(packets_module):
+    session = SyntheticSession(packets_module, session_uid=7)
+    first, second = session.step(), session.step()
+    assembler, frames = assemble(packets_module, [first, second, first[-1:]], Clock())
+    assert [frame.overall_frame_identifier for frame in frames] == [1]
+    assert assembler.stats["late"] == 1
+
+
+def test_incomplete_frame_times_out(packets_module):
+    session = SyntheticSession(packets_module, session_uid=7)
+    clock = Clock()
+    assembler, frames = assemble(packets_module, [session.step()[1:]], clock)
+    assert frames == []
+    clock.now += 1
+    assembler.expire()
+    assert len(frames) == 1 and not frames[0].complete
+    assert assembler.stats["incomplete"] == 1
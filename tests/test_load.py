@@ -0,0 +1,56 @@
+import io
+import zipfile
+
+from utils.doc.load import get_str_from_doc, iter_doc, read_doc
+
+NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def docx(body: str) -> io.BytesIO:
+    """Returns an in-memory .docx whose document.xml has ``body``"""
+    document = f'<?xml version="1.0" encoding="UTF-8"?><w:document xmlns:w="{NAMESPACE}"><w:body>{body}</w:body></w:document>'
+    file = io.BytesIO()
+    with zipfile.ZipFile(file, "w") as archive:
+        archive.writestr("word/document.xml", document)
+    file.seek(0)
+    return file
+
+
+def paragraph(content: str) -> str:
+    return f"<w:p><w:pPr><w:tabs><w:tab w:val=\"left\" w:pos=\"720\"/></w:tabs></w:pPr>{content}</w:p>"
+
+
+def run(text: str) -> str:
+    return f"<w:r><w:t xml:space=\"preserve\">{text}</w:t></w:r>"
+
+
+def test_paragraphs_are_separated_by_new_lines():
+    body = paragraph(run("struct PacketHeader")) + paragraph(run("{")) + paragraph(
+        "<w:r><w:t>uint16</w:t><w:tab/><w:t>m_packetFormat;</w:t><w:br/><w:t>// &amp; more</w:t></w:r>")
+    assert get_str_from_doc(docx(body)) == "struct PacketHeader\n{\nuint16\tm_packetFormat;\n// & more"
+
+
+def test_hyperlink_inserted_and_deleted_runs():
+    body = paragraph(
+        run("uint8 ")
+        + f"<w:hyperlink>{run('m_')}</w:hyperlink>"
+        + f"<w:ins w:id=\"1\">{run('gameYear')}</w:ins>"
+        + "<w:del w:id=\"2\"><w:r><w:tab/><w:delText>m_oldName</w:delText></w:r></w:del>"
+        + f"<w:sdt><w:sdtContent>{run(';')}</w:sdtContent></w:sdt>"
+        + f"<w:fldSimple w:instr=\"PAGE\">{run(' // 24')}</w:fldSimple>")
+    assert get_str_from_doc(docx(body)) == "uint8 m_gameYear; // 24"
+
+
+def test_table_cells():
+    body = (paragraph(run("before"))
+            + "<w:tbl>"
+            + "<w:tr><w:tc><w:tcPr><w:gridSpan w:val=\"2\"/></w:tcPr>" + paragraph(run("ID")) + "</w:tc></w:tr>"
+            + "<w:tr><w:tc>" + paragraph(run("0")) + paragraph(run("zero")) + "</w:tc>"
+            + "<w:tc>" + paragraph(f"<w:ins w:id=\"3\">{run('Mercedes')}</w:ins>") + "</w:tc></w:tr>"
+            + "</w:tbl>"
+            + paragraph(run("after")))
+    text, tables = read_doc(docx(body))
+    assert tables == [[["ID", "ID"], ["0\nzero", "Mercedes"]]]
+    assert text == "before\nID\n0\nzero\nMercedes\nafter"
+    kinds = [kind for kind, _ in iter_doc(docx(body))]
+    assert kinds == ["paragraph"] * 5 + ["table", "paragraph"]
@@ -0,0 +1,96 @@
+import pytest
+
+from udp.dispatch import PACKET_HEADER
+from udp.metrics import Metrics
+
+ADDRESS = ("10.0.0.1", 20777)
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class PacketMotionData(object):
+    pass
+
+
+def datagram(packet_id: int, frame: int, session_uid: int = 7, session_time: float = None) -> bytes:
+    if session_time is None:
+        session_time = frame / 60
+    return PACKET_HEADER.pack(2024, 24, 1, 0, 1, packet_id, session_uid, session_time, frame, frame, 0, 255)
+
+
+def observe(metrics: Metrics, clock: Clock, packet_id: int, frames: list, address=ADDRESS, session_uid: int = 7):
+    for frame in frames:
+        clock.now = 100.0 + frame / 60
+        metrics.observe(datagram(packet_id, frame, session_uid), address)
+
+
+def test_gaps_duplicates_and_reordering():
+    clock = Clock()
+    metrics = Metrics(clock)
+    observe(metrics, clock, 0, [1, 2, 3, 5, 5, 4, 6])
+    source = metrics.sources[(ADDRESS, 7)]
+    assert source.to_dict() == {"packets": 7, "lost": 1, "out_of_order": 1, "duplicates": 1, "jitter_ms": 0.0}
+
+
+def test_gaps_of_packets_not_sent_every_frame():
+    clock = Clock()
+    metrics = Metrics(clock)
+    # session data every 30 frames, one missing
+    observe(metrics, clock, 1, [0, 30, 60, 120, 150])
+    # events are not sequenced
+    observe(metrics, clock, 3, [10, 10, 2, 90])
+    source = metrics.sources[(ADDRESS, 7)]
+    assert (source.packets, source.lost, source.duplicates, source.out_of_order) == (9, 1, 0, 0)
+
+
+def test_sources_and_sessions_are_counted_apart():
+    clock = Clock()
+    metrics = Metrics(clock)
+    observe(metrics, clock, 0, [1, 2, 4])
+    observe(metrics, clock, 0, [1, 2], address=("10.0.0.2", 20777))
+    observe(metrics, clock, 0, [1, 2], session_uid=8)
+    metrics.observe(b"\x00" * 10, ADDRESS)
+    assert {key: source.lost for key, source in metrics.sources.items()} == {
+        (ADDRESS, 7): 1, (("10.0.0.2", 20777), 7): 0, (ADDRESS, 8): 0}
+    assert list(metrics.to_dict()["sources"]) == ["10.0.0.1:20777/7", "10.0.0.2:20777/7", "10.0.0.1:20777/8"]
+
+
+def test_jitter():
+    clock = Clock()
+    metrics = Metrics(clock)
+    clock.now = 10.0
+    metrics.observe(datagram(0, 1, session_time=1.0), ADDRESS)
+    clock.now = 10.032
+    metrics.observe(datagram(0, 2, session_time=1.016), ADDRESS)
+    # session_time is a float32
+    assert metrics.sources[(ADDRESS, 7)].jitter == pytest.approx(0.016 / 16, rel=1e-3)
+
+
+def test_prometheus():
+    clock = Clock()
+    metrics = Metrics(clock)
+    observe(metrics, clock, 0, [1, 2, 4, 4])
+    metrics.observe_decode(PacketMotionData, 1.5e-6)
+    metrics.observe_decode(PacketMotionData, 3e-6)
+    metrics.observe_decode(PacketMotionData, 1.0)
+    lines = metrics.to_prometheus().splitlines()
+    labels = 'source="10.0.0.1:20777",session_uid="7"'
+    assert "# TYPE f1_udp_lost_total counter" in lines
+    assert f"f1_udp_packets_total{{{labels}}} 4" in lines
+    assert f"f1_udp_lost_total{{{labels}}} 1" in lines
+    assert f"f1_udp_duplicates_total{{{labels}}} 1" in lines
+    assert f"f1_udp_out_of_order_total{{{labels}}} 0" in lines
+    assert "# TYPE f1_udp_decode_seconds histogram" in lines
+    buckets = [line for line in lines if line.startswith("f1_udp_decode_seconds_bucket")]
+    assert buckets[0] == 'f1_udp_decode_seconds_bucket{packet="PacketMotionData",le="1e-06"} 0'
+    assert buckets[1] == 'f1_udp_decode_seconds_bucket{packet="PacketMotionData",le="2e-06"} 1'
+    assert buckets[2] == 'f1_udp_decode_seconds_bucket{packet="PacketMotionData",le="5e-06"} 2'
+    assert buckets[-2] == 'f1_udp_decode_seconds_bucket{packet="PacketMotionData",le="0.001"} 2'
+    assert buckets[-1] == 'f1_udp_decode_seconds_bucket{packet="PacketMotionData",le="+Inf"} 3'
+    assert 'f1_udp_decode_seconds_count{packet="PacketMotionData"} 3' in lines
@@ -0,0 +1,71 @@
+import os
+import socket
+
+import pytest
+
+from udp import mmsg, packets
+from udp.mmsg import MessageBatch, ReceiveBatch
+from udp.receiver import Receiver
+
+PACKETS_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "F124", "packets.py")
+
+
+@pytest.fixture(params=["mmsg", "loop"])
+def sockets(request, monkeypatch):
+    if request.param == "mmsg" and not mmsg.HAVE_RECVMMSG:
+        pytest.skip("no sendmmsg/recvmmsg")
+    if request.param == "loop":
+        monkeypatch.setattr(mmsg, "_libc", None)
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(1.0)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender.connect(receiver.getsockname())
+    yield sender, receiver
+    sender.close()
+    receiver.close()
+
+
+def test_send_and_receive(sockets):
+    sender, receiver = sockets
+    datagrams = [bytes([i]) * (10 + i) for i in range(3)]
+    assert MessageBatch(4, 16).send(sender, datagrams) == 3
+    batch = ReceiveBatch(4, 16)
+    n = batch.receive(receiver)
+    assert n == 3
+    assert [bytes(datagram) for datagram in batch.datagrams(n)] == datagrams
+    assert [batch.truncated(i) for i in range(n)] == [False] * 3
+    assert batch.address(0) == sender.getsockname()
+
+
+def test_send_rejects_datagrams_larger_than_a_slot(sockets):
+    sender, receiver = sockets
+    with pytest.raises(ValueError, match="17 bytes"):
+        MessageBatch(4, 16).send(sender, [b"a", b"b" * 17])
+    receiver.settimeout(0.05)
+    with pytest.raises(socket.timeout):
+        ReceiveBatch(4, 16).receive(receiver)
+
+
+def test_truncated_datagrams(sockets):
+    sender, receiver = sockets
+    sender.send(b"a" * 20)
+    sender.send(b"b" * 8)
+    batch = ReceiveBatch(4, 16)
+    n = batch.receive(receiver)
+    assert n == 2
+    assert [batch.truncated(i) for i in range(n)] == [True, False]
+    assert len(batch.datagram(0)) == 16
+    assert bytes(batch.datagram(1)) == b"b" * 8
+
+
+def test_receiver_counts_truncated_datagrams_as_malformed(sockets):
+    sender, receiver_socket = sockets
+    raw = []
+    receiver = Receiver(packets.load(PACKETS_PATH), sock=receiver_socket, on_stats=None, batch_size=4)
+    receiver.batch = ReceiveBatch(4, 64)
+    receiver.add_raw_handler(lambda datagram, address: raw.append(bytes(datagram)))
+    sender.send(b"x" * 100)
+    assert receiver.receive_batch() == [(None, sender.getsockname())]
+    assert receiver._stats.malformed == 1
+    assert raw == []
@@ -0,0 +1,103 @@
+import os
+import struct
+
+import pytest
+
+from udp import packets
+from udp.recording import SORTED_INDEX_SUFFIX, Recorder, RecordingIndex, RecordingReader
+
+# packet_format, game_year, game_major_version, game_minor_version, packet_version, packet_id,
+# session_uid, session_time, frame_identifier, overall_frame_identifier, player_car_index,
+# secondary_player_car_index
+HEADER = struct.Struct("<HBBBBBQfIIBB")
+
+PACKETS_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "F124", "packets.py")
+
+
+def datagram(session_uid: int, frame: int, packet_id: int) -> bytes:
+    return HEADER.pack(2024, 24, 1, 0, 1, packet_id, session_uid, frame / 60, frame, frame, 0, 255)
+
+
+def record(path: str, close: bool = True):
+    recorder = Recorder(path)
+    offsets = {}
+    # two interleaved sessions, one frame arriving late
+    for session_uid, frame, packet_id in [(2, 1, 0), (1, 1, 0), (1, 1, 2), (2, 2, 0), (1, 3, 0), (1, 2, 0)]:
+        offsets[(session_uid, frame, packet_id)] = recorder._offset
+        recorder.write(datagram(session_uid, frame, packet_id), timestamp=0.0)
+    if close:
+        recorder.close()
+    else:
+        recorder.flush()
+    return recorder, offsets
+
+
+def check_index(index: RecordingIndex, offsets: dict):
+    assert len(index) == len(offsets)
+    assert index.session_uids() == [1, 2]
+    assert index.find(1, 1) == {0: offsets[(1, 1, 0)], 2: offsets[(1, 1, 2)]}
+    assert index.seek(1, 2) == offsets[(1, 2, 0)]
+    assert index.seek(2) == offsets[(2, 1, 0)]
+    assert list(index.entries) == sorted(index.entries)
+
+
+def test_close_writes_sorted_index(tmp_path):
+    path = str(tmp_path / "session.rec")
+    _, offsets = record(path)
+    assert os.path.getsize(path + SORTED_INDEX_SUFFIX) == os.path.getsize(path + ".idx")
+    index = RecordingIndex(path)
+    assert index._map is not None
+    check_index(index, offsets)
+    index.close()
+
+
+def test_index_of_recording_in_progress(tmp_path):
+    path = str(tmp_path / "session.rec")
+    recorder, offsets = record(path, close=False)
+    index = RecordingIndex(path)
+    assert index._map is None
+    check_index(index, offsets)
+    recorder.close()
+
+
+def test_reader_seeks_with_sorted_index(tmp_path):
+    path = str(tmp_path / "session.rec")
+    _, offsets = record(path)
+    with RecordingReader(path) as reader:
+        offset = reader.index.seek(1, 3)
+        assert offset == offsets[(1, 3, 0)]
+        first = next(reader.records(offset))
+        assert bytes(first[2]) == datagram(1, 3, 0)
+        del first
+
+
+def test_reader_without_packets_module(tmp_path):
+    path = str(tmp_path / "session.rec")
+    record(path)
+    with RecordingReader(path) as reader:
+        with pytest.raises(ValueError, match="no packets module"):
+            reader.packets()
+        with pytest.raises(ValueError, match="no packets module"):
+            reader.seek(1)
+        records = [bytes(datagram) for _, _, datagram in reader]
+        assert records[:2] == [datagram(2, 1, 0), datagram(1, 1, 0)]
+        assert len(records) == 6
+        del records
+
+
+def test_reader_decodes_packets(tmp_path):
+    packets_module = packets.load(PACKETS_PATH)
+    motion = packets_module.PacketMotionData()
+    motion.header.packet_format = 2024
+    motion.header.packet_version = 1
+    motion.header.session_uid = 1
+    motion.header.overall_frame_identifier = 5
+    path = str(tmp_path / "session.rec")
+    recorder = Recorder(path)
+    recorder.write(datagram(1, 4, 0), timestamp=1.0)
+    recorder.write(bytes(motion), timestamp=2.0)
+    recorder.close()
+    with RecordingReader(path, packets_module) as reader:
+        decoded = [(timestamp, type(packet).__name__) for timestamp, packet in reader]
+        assert decoded == [(2.0, "PacketMotionData")]
+        assert [timestamp for timestamp, _ in reader.seek(1, 5)] == [2.0]
@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+from udp import packets
+from udp.dispatch import PACKET_HEADER
+from udp.sampling import Drop, EveryNth, Interval, OnChange, Sampler, parse_rule
+
+PACKETS_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "F124", "packets.py")
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def datagram(packet_id: int, session_uid: int = 1, payload: bytes = b"") -> bytes:
+    return PACKET_HEADER.pack(2024, 24, 1, 0, 1, packet_id, session_uid, 0.0, 0, 0, 0, 255) + payload
+
+
+def test_every_nth_per_session():
+    sampler = Sampler({0: EveryNth(3)})
+    kept = [sampler.accept(datagram(0)) for _ in range(7)]
+    assert kept == [True, False, False, True, False, False, True]
+    assert sampler.accept(datagram(0, session_uid=2))
+    assert sampler.accept(datagram(1))
+    assert sampler.dropped == 4
+
+
+def test_interval_keeps_the_cadence():
+    clock = Clock()
+    sampler = Sampler({6: Interval(0.1, clock=clock)})
+    kept = []
+    for tick in range(12):
+        clock.now = tick * 0.025
+        kept.append(sampler.accept(datagram(6)))
+    # one in four datagrams at 40 Hz is kept at 10 Hz
+    assert kept == [True, False, False, False] * 3
+    # after a pause the next datagram is kept and starts a new cadence
+    clock.now = 5.0
+    assert sampler.accept(datagram(6))
+    clock.now = 5.05
+    assert not sampler.accept(datagram(6))
+
+
+def test_on_change_compares_the_payload():
+    sampler = Sampler({1: OnChange()})
+    assert sampler.accept(datagram(1, payload=b"a"))
+    assert not sampler.accept(datagram(1, payload=b"a"))
+    assert sampler.accept(datagram(1, payload=b"b"))
+    # the header is not compared
+    changed_header = bytearray(datagram(1, payload=b"b"))
+    changed_header[PACKET_HEADER.size - 3] = 9
+    assert not sampler.accept(bytes(changed_header))
+    # only the first n bytes are compared
+    assert not sampler.accept(datagram(1, payload=b"b" + b"padding"), PACKET_HEADER.size + 1)
+
+
+def test_rules_by_packet_name():
+    packets_module = packets.load(PACKETS_PATH)
+    sampler = Sampler({"PacketCarTelemetryData": Drop()}, packets_module)
+    assert not sampler.accept(datagram(6))
+    assert sampler.accept(datagram(0))
+    with pytest.raises(ValueError, match="unknown packet"):
+        Sampler({"PacketNothing": Drop()}, packets_module)
+
+
+def test_parse_rule():
+    assert parse_rule("every:6").n == 6
+    assert parse_rule("hz:10").seconds == pytest.approx(0.1)
+    assert parse_rule("interval:0.5").seconds == 0.5
+    assert isinstance(parse_rule("on-change"), OnChange)
+    assert isinstance(parse_rule("drop"), Drop)
+
+
+@pytest.mark.parametrize("value", ["hz:0", "hz:-1", "hz:inf", "every:0", "every:x", "interval:0", "interval:nan",
+                                   "on-change:1", "sometimes"])
+def test_parse_rule_rejects_invalid_rules(value):
+    with pytest.raises(ValueError, match=f"invalid sampling rule '{value}'"):
+        parse_rule(value)
@@ -0,0 +1,99 @@
+import ctypes
+import json
+import struct
+
+import pytest
+
+from utils.doc.schema import Schema, SchemaError
+from write.emitters import CtypesEmitter, DtypeEmitter, JsonEmitter, StructFormatEmitter
+
+SPEC = """
+struct PacketHeader
+{
+    uint16    m_packetFormat;            // 2024
+    uint8     m_gameYear;                // Game year - last two digits e.g. 24
+    uint64    m_sessionUID;              // Unique identifier for the session
+    float     m_sessionTime;             // Session timestamp
+    uint8     m_playerCarIndex;          // Index of player's car in the array
+};
+
+struct CarDamageData
+{
+    float     m_tyresWear[4];            // Tyre wear (percentage)
+    uint8     m_tyresDamage[4];          // Tyre damage (percentage)
+    int8      m_drsFault;                // Indicator for DRS fault, 0 = OK, 1 = fault
+};
+
+struct PacketCarDamageData
+{
+    PacketHeader    m_header;            // Header
+    CarDamageData   m_carDamageData[22];
+    char            m_name[3];
+    double          m_time;
+};
+"""
+
+
+@pytest.fixture
+def schema():
+    return Schema.from_text(SPEC)
+
+
+def test_offsets_and_sizes(schema):
+    header = schema["PacketHeader"]
+    assert [(field.name, field.offset, field.size) for field in header] == [
+        ("packet_format", 0, 2),
+        ("game_year", 2, 1),
+        ("session_uid", 3, 8),
+        ("session_time", 11, 4),
+        ("player_car_index", 15, 1),
+    ]
+    assert header.size == 16
+    packet = schema["PacketCarDamageData"]
+    assert [(field.spec_name, field.offset, field.size) for field in packet] == [
+        ("header", 0, 16),
+        ("carDamageData", 16, 22 * 21),
+        ("name", 16 + 22 * 21, 3),
+        ("time", 16 + 22 * 21 + 3, 8),
+    ]
+    assert packet.size == 16 + 22 * 21 + 3 + 8
+
+
+def test_ctypes_sizes(schema):
+    namespace = {"ctypes": ctypes}
+    exec("class Packet(ctypes.LittleEndianStructure):\n\t_pack_ = 1\n\n" + CtypesEmitter().emit(schema), namespace)
+    for schema_struct in schema:
+        ctypes_class = namespace[schema_struct.name]
+        assert ctypes.sizeof(ctypes_class) == schema_struct.size
+        for field in schema_struct:
+            assert getattr(ctypes_class, field.name).offset == field.offset
+
+
+def test_struct_format_sizes(schema):
+    emitter = StructFormatEmitter()
+    for schema_struct in schema:
+        assert struct.calcsize(emitter.format(schema_struct)) == schema_struct.size
+    assert emitter.format(schema["CarDamageData"]) == "<4f4Bb"
+
+
+def test_dtype_sizes(schema):
+    np = pytest.importorskip("numpy")
+    namespace = {"np": np}
+    exec(DtypeEmitter().emit(schema), namespace)
+    for schema_struct in schema:
+        dtype = namespace[schema_struct.name]
+        assert dtype.itemsize == schema_struct.size
+        for field in schema_struct:
+            assert dtype.fields[field.name][1] == field.offset
+
+
+def test_json_uses_spec_names(schema):
+    packet = json.loads(JsonEmitter().emit(schema))["PacketCarDamageData"]
+    assert packet["header"]["sessionUID"] == "uint64"
+    assert len(packet["carDamageData"]) == 22
+    assert packet["carDamageData"][0]["tyresWear"] == ["float"] * 4
+
+
+def test_unknown_type():
+    with pytest.raises(SchemaError, match="unknown type"):
+        Schema.from_text("struct A { uint24 m_a; };")
@@ -0,0 +1,89 @@
+import os
+from multiprocessing import resource_tracker
+
+import pytest
+
+from udp import packets, shm
+from udp.shm import RingOverrun, RingReader, RingWriter
+
+PACKETS_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "F124", "packets.py")
+
+
+@pytest.fixture(scope="module")
+def packets_module():
+    return packets.load(PACKETS_PATH)
+
+
+def lap_data(packets_module, frame: int) -> bytes:
+    packet = packets_module.PacketLapData()
+    packet.header.packet_format = 2024
+    packet.header.packet_version = 1
+    packet.header.packet_id = 2
+    packet.header.frame_identifier = frame
+    return bytes(packet)
+
+
+def test_readers_follow_the_writer(packets_module):
+    with RingWriter(slots=8) as writer:
+        early = RingReader(writer.name, packets_module)
+        for frame in range(3):
+            assert writer.write(lap_data(packets_module, frame)) == frame
+        late = RingReader(writer.name, packets_module)
+        writer.write(b"not a packet")
+        writer.write(lap_data(packets_module, 3))
+
+        received = early.poll()
+        assert [(sequence, packet.header.frame_identifier) for sequence, packet in received] == [
+            (0, 0), (1, 1), (2, 2), (4, 3)]
+        assert all(early.valid(sequence) for sequence, _ in received)
+        del received
+        assert [sequence for sequence, _ in late.poll()] == [4]
+        assert early.poll() == []
+        early.close()
+        late.close()
+
+
+def test_overrun(packets_module):
+    with RingWriter(slots=4) as writer:
+        reader = RingReader(writer.name, packets_module)
+        view = None
+        for frame in range(10):
+            writer.write(lap_data(packets_module, frame))
+            if frame == 0:
+                sequence, view = reader.read()
+        # the slot of datagram 0 has been reused, so the view is no longer valid
+        assert not reader.valid(sequence)
+        del view
+        with pytest.raises(RingOverrun):
+            reader.read()
+        assert reader.lost == 6
+        assert [sequence for sequence, _ in reader.poll()] == [7, 8, 9]
+        reader.close()
+
+
+def test_from_start(packets_module):
+    with RingWriter(slots=4) as writer:
+        for frame in range(6):
+            writer.write(lap_data(packets_module, frame))
+        reader = RingReader(writer.name, packets_module, from_start=True)
+        assert [sequence for sequence, _ in reader.poll()] == [2, 3, 4, 5]
+        reader.close()
+
+
+def test_write_rejects_datagrams_larger_than_a_slot():
+    with RingWriter(slots=2, slot_size=8) as writer:
+        with pytest.raises(ValueError, match="9 bytes"):
+            writer.write(b"x" * 9)
+
+
+def test_attach_without_track_does_not_register_the_block(monkeypatch):
+    registered = []
+    monkeypatch.setattr(shm, "_HAVE_TRACK", False)
+    with RingWriter(slots=2) as writer:
+        with monkeypatch.context() as patch:
+            patch.setattr(resource_tracker, "register", lambda name, rtype: registered.append((name, rtype)))
+            register = resource_tracker.register
+            reader = shm._attach(writer.name)
+            assert registered == []
+            assert resource_tracker.register is register
+        reader.close()
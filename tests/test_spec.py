@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+from utils.doc import spec
+
+
+def test_failed_cache_write_leaves_no_temporary_file(tmp_path, monkeypatch):
+    cache_path = str(tmp_path / "entry.json")
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(spec.os, "replace", fail)
+    spec._write_cache(cache_path, spec.Spec("spec.docx", "text", [[["a"]]]))
+    assert os.listdir(tmp_path) == []
+
+    monkeypatch.setattr(spec.json, "dump", lambda *args: (_ for _ in ()).throw(KeyboardInterrupt))
+    with pytest.raises(KeyboardInterrupt):
+        spec._write_cache(cache_path, spec.Spec("spec.docx", "text", [[["a"]]]))
+    assert os.listdir(tmp_path) == []
+
+
+def test_cache_entry_round_trip(tmp_path):
+    cache_path = str(tmp_path / "entry.json")
+    spec._write_cache(cache_path, spec.Spec("spec.docx", "text", [[["a", "b"]]]))
+    assert spec._read_cache(cache_path) == {"text": "text", "tables": [[["a", "b"]]]}
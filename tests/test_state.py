@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+from udp import packets
+from udp.state import NUM_CARS, SessionState, SessionStore
+
+PACKETS_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "F124", "packets.py")
+
+
+@pytest.fixture(scope="module")
+def packets_module():
+    return packets.load(PACKETS_PATH)
+
+
+def packet(packet_type, frame: int, session_uid: int = 7):
+    instance = packet_type()
+    instance.header.packet_format = 2024
+    instance.header.session_uid = session_uid
+    instance.header.frame_identifier = frame
+    return instance
+
+
+def packet_copy(instance, frame: int):
+    copy = type(instance).from_buffer_copy(instance)
+    copy.header.frame_identifier = frame
+    return copy
+
+
+def test_apply_updates_views_in_place(packets_module):
+    state = SessionState(7, packets_module)
+    lap_data = state.car(3).lap_data
+    lap_data_packet = packet(packets_module.PacketLapData, 10)
+    lap_data_packet.lap_data[3].current_lap_num = 2
+    state.apply(lap_data_packet, ("127.0.0.1", 20777))
+    assert lap_data.current_lap_num == 2
+    assert state.car(3).lap_data is lap_data
+
+    lap_data_packet.lap_data[3].current_lap_num = 3
+    state.apply(packet_copy(lap_data_packet, 11), ("127.0.0.1", 20777))
+    assert lap_data.current_lap_num == 3
+    assert state.frame() == 11
+    assert state.updated == {"PacketLapData": 11}
+
+
+def test_snapshot_does_not_change(packets_module):
+    state = SessionState(7, packets_module)
+    lap_data = packet(packets_module.PacketLapData, 1)
+    lap_data.lap_data[0].current_lap_num = 1
+    state.apply(lap_data, "a")
+    snapshot = state.snapshot()
+
+    lap_data.lap_data[0].current_lap_num = 5
+    state.apply(packet_copy(lap_data, 2), "b")
+    assert snapshot["PacketLapData"].lap_data[0].current_lap_num == 1
+    assert snapshot["frames"] == {"a": 1}
+    assert state.get(packets_module.PacketLapData).lap_data[0].current_lap_num == 5
+    assert state.frames == {"a": 1, "b": 2}
+
+
+def test_per_car_packets(packets_module):
+    state = SessionState(7, packets_module)
+    history = packet(packets_module.PacketSessionHistoryData, 1)
+    history.car_idx = 4
+    history.num_laps = 12
+    state.apply(history)
+    assert state.car(4).session_history_data.num_laps == 12
+    assert state.car(3).session_history_data.num_laps == 0
+    snapshot = state.snapshot()["PacketSessionHistoryData"]
+    assert len(snapshot) == NUM_CARS and snapshot[4].num_laps == 12
+
+
+def test_car_index_out_of_range_is_ignored(packets_module):
+    state = SessionState(7, packets_module)
+    history = packet(packets_module.PacketSessionHistoryData, 1)
+    history.car_idx = NUM_CARS
+    history.num_laps = 12
+    state.apply(history)
+    assert all(car.num_laps == 0 for car in state.get(packets_module.PacketSessionHistoryData))
+    assert state.frame() is None
+    with pytest.raises(IndexError):
+        state.car(NUM_CARS)
+
+
+def test_store_keeps_sessions_apart(packets_module):
+    store = SessionStore(packets_module)
+    first = packet(packets_module.PacketLapData, 1, session_uid=1)
+    first.lap_data[0].current_lap_num = 1
+    second = packet(packets_module.PacketLapData, 1, session_uid=2)
+    second.lap_data[0].current_lap_num = 2
+    store.apply(first)
+    store.apply(second)
+    assert store.latest().session_uid == 2
+    assert store.get(1).car(0).lap_data.current_lap_num == 1
+    assert store.get(2).car(0).lap_data.current_lap_num == 2
+    store.remove(2)
+    assert store.latest() is None and list(store.sessions) == [1]
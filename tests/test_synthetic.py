@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+from udp import packets
+from udp.dispatch import HEADER_DISPATCH
+from udp.synthetic import PACKET_RATES, SyntheticSession
+
+PACKETS_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "F124", "packets.py")
+
+
+@pytest.fixture(scope="module")
+def packets_module():
+    return packets.load(PACKETS_PATH)
+
+
+def decode(packets_module, datagram: bytes):
+    return packets_module.HEADER_FIELD_TO_PACKET_TYPE[HEADER_DISPATCH.unpack_from(datagram)].unpack(datagram)
+
+
+def test_packet_rates(packets_module):
+    session = SyntheticSession(packets_module, session_uid=7)
+    counts = {}
+    seconds = 10
+    for _ in range(seconds * 60):
+        for datagram in session.step():
+            name = type(decode(packets_module, datagram)).__name__
+            counts[name] = counts.get(name, 0) + 1
+    assert counts["PacketCarTelemetryData"] == seconds * 60
+    for name, rate in PACKET_RATES.items():
+        assert counts[name] == seconds * rate, name
+
+
+def test_tyre_wear_is_never_negative(packets_module):
+    session = SyntheticSession(packets_module, session_uid=7)
+    damage = [decode(packets_module, datagram) for datagram in session.step()]
+    damage = [packet for packet in damage if type(packet).__name__ == "PacketCarDamageData"][0]
+    wear = [car.tyres_wear[wheel] for car in damage.car_damage_data for wheel in range(4)]
+    assert min(wear) == 0.0